@@ -28,8 +28,10 @@ from .core import (
     decode_token,
     authenticate_user,
     get_current_user,
-    get_optional_user,
     get_current_active_user,
+    get_current_principal,
+    get_current_active_principal,
+    get_optional_principal,
     get_user_from_partial_token,
     require_role,
     require_any_role,
@@ -37,6 +39,7 @@ from .core import (
     is_user_admin,
     OptionalAuth,
     RequireAuth,
+    RequireUser,
     RequireAuthWS,
     RequireAdmin,
     RequireMember,
@@ -46,6 +49,16 @@ from .core import (
     RequireStaffWS,
 )
 
+from .principal import (
+    PRINCIPAL_CACHE_TTL,
+    PRINCIPAL_CACHE_SIZE,
+    Principal,
+    PrincipalCache,
+    principal_cache,
+    get_principal,
+    invalidate_principal,
+)
+
 from .seed import (
     seed_roles,
     seed_admin,
@@ -95,19 +108,29 @@ __all__ = [
     "authenticate_user",
     "get_current_user",
     "get_current_active_user",
-    "get_optional_user",
+    "get_current_principal",
+    "get_current_active_principal",
+    "get_optional_principal",
     "require_role",
     "require_any_role",
     "is_user_staff",
     "is_user_admin",
     "OptionalAuth",
     "RequireAuth",
+    "RequireUser",
     "RequireAuthWS",
     "RequireAdmin",
     "RequireMember",
     "RequireLibrarian",
     "RequireStaff",
     "RequireStaffWS",
+    "PRINCIPAL_CACHE_TTL",
+    "PRINCIPAL_CACHE_SIZE",
+    "Principal",
+    "PrincipalCache",
+    "principal_cache",
+    "get_principal",
+    "invalidate_principal",
     "seed_roles",
     "seed_admin",
     "run_seeds",
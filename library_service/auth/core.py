@@ -17,6 +17,7 @@ from sqlmodel import Session, select
 
 from library_service.models.db import User
 from library_service.models.dto import TokenData
+from library_service.auth.principal import Principal, get_principal
 from library_service.settings import get_session, get_logger
 
 
@@ -218,63 +219,92 @@ def authenticate_user(session: Session, username: str, password: str) -> User |
     return user
 
 
-def get_optional_user(
+def _unauthorized(detail: str) -> HTTPException:
+    """Возвращает исключение 401 с заголовком WWW-Authenticate"""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_optional_principal(
     token: Annotated[str | None, Depends(oauth2_scheme)],
-    session: Session = Depends(get_session),
-) -> User | None:
-    """Возвращает текущего пользователя или None, если не авторизован"""
+) -> Principal | None:
+    """Возвращает текущего субъекта или None, если не авторизован"""
     if not token:
         return None
     try:
         token_data = decode_token(token)
-        user = session.get(User, token_data.user_id)
-        if user and user.is_active:
-            return user
     except HTTPException:
-        pass
+        return None
+    principal = await get_principal(token_data.user_id)  # ty: ignore[invalid-argument-type]
+    if principal and principal.is_active:
+        return principal
     return None
 
 
-def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    session: Session = Depends(get_session),
-) -> User:
-    """Возвращает текущего авторизованного пользователя"""
+async def get_current_principal(
+    token: Annotated[str | None, Depends(oauth2_scheme)],
+) -> Principal:
+    """Возвращает текущего субъекта без обращения к базе данных при попадании в кэш"""
+    if not token:
+        raise _unauthorized("Not authenticated")
     token_data = decode_token(token)
 
-    user = session.get(User, token_data.user_id)
-    if user is None:
+    principal = await get_principal(token_data.user_id)  # ty: ignore[invalid-argument-type]
+    if principal is None:
+        raise _unauthorized("User not found")
+    return principal
+
+
+async def get_current_active_principal(
+    principal: Annotated[Principal, Depends(get_current_principal)],
+) -> Principal:
+    """Проверяет активность субъекта и возвращает его"""
+    if not principal.is_active:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
+            status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user"
         )
-    return user
+    return principal
 
 
-async def get_current_user_ws(
+async def get_current_principal_ws(
     websocket: WebSocket,
     token: Annotated[str | None, Query()] = None,
-    session: Session = Depends(get_session),
-) -> User:
+) -> Principal:
     """Аутентификация для WebSocket через Query параметр."""
     if token is None:
         raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Token required")
 
     try:
         token_data = decode_token(token)
+    except HTTPException:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid token")
 
-        user = session.get(User, token_data.user_id)
-        if user is None:
-             raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="User not found")
+    principal = await get_principal(token_data.user_id)  # ty: ignore[invalid-argument-type]
+    if principal is None:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="User not found")
 
-        if not user.is_active:
-             raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Inactive user")
+    if not principal.is_active:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Inactive user")
 
-        return user
+    return principal
 
-    except HTTPException:
-        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid token")
+
+def get_current_user(
+    token: Annotated[str | None, Depends(oauth2_scheme)],
+    session: Session = Depends(get_session),
+) -> User:
+    """Возвращает текущего авторизованного пользователя"""
+    if not token:
+        raise _unauthorized("Not authenticated")
+    token_data = decode_token(token)
+
+    user = session.get(User, token_data.user_id)
+    if user is None:
+        raise _unauthorized("User not found")
+    return user
 
 
 def get_current_active_user(
@@ -289,10 +319,12 @@ def get_current_active_user(
 
 
 def get_user_from_partial_token(
-    token: Annotated[str, Depends(oauth2_scheme)],
+    token: Annotated[str | None, Depends(oauth2_scheme)],
     session: Session = Depends(get_session),
 ) -> User:
     """Возвращает пользователя из partial токена (для 2FA верификации)"""
+    if not token:
+        raise _unauthorized("Not authenticated")
     token_data = decode_token(token, expected_type="access", allow_partial=True)
 
     if not token_data.is_partial:
@@ -303,78 +335,78 @@ def get_user_from_partial_token(
 
     user = session.get(User, token_data.user_id)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _unauthorized("User not found")
     return user
 
 
 def require_role(role_name: str):
     """Создает dependency для проверки наличия определенной роли"""
 
-    def role_checker(current_user: User = Depends(get_current_active_user)) -> User:
-        user_roles = [role.name for role in current_user.roles]
-        if role_name not in user_roles:
+    async def role_checker(
+        principal: Principal = Depends(get_current_active_principal),
+    ) -> Principal:
+        if role_name not in principal.roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Role '{role_name}' required",
             )
-        return current_user
+        return principal
 
     return role_checker
 
 
 def require_any_role(allowed_roles: list[str]):
     """Создает dependency для проверки наличия хотя бы одной из ролей"""
+    allowed = frozenset(allowed_roles)
 
-    def role_checker(current_user: User = Depends(get_current_active_user)) -> User:
-        user_roles = {role.name for role in current_user.roles}
-        if not (user_roles & set(allowed_roles)):
+    async def role_checker(
+        principal: Principal = Depends(get_current_active_principal),
+    ) -> Principal:
+        if not principal.has_any_role(allowed):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Requires one of roles: {allowed_roles}",
             )
-        return current_user
+        return principal
 
     return role_checker
 
 
 def require_any_role_ws(allowed_roles: list[str]):
     """Создает dependency для WebSocket проверки наличия хотя бы одной из ролей"""
+    allowed = frozenset(allowed_roles)
 
-    def role_checker(current_user: User = Depends(get_current_user_ws)) -> User:
-        user_roles = {role.name for role in current_user.roles}
-        if not (user_roles & set(allowed_roles)):
+    async def role_checker(
+        principal: Principal = Depends(get_current_principal_ws),
+    ) -> Principal:
+        if not principal.has_any_role(allowed):
             raise WebSocketException(
                 code=status.WS_1008_POLICY_VIOLATION,
                 reason=f"Requires one of roles: {allowed_roles}",
             )
-        return current_user
+        return principal
 
     return role_checker
 
 
 # Создание dependencies
-OptionalAuth = Annotated[User | None, Depends(get_optional_user)]
-RequireAuth = Annotated[User, Depends(get_current_active_user)]
-RequireAuthWS = Annotated[User, Depends(get_current_user_ws)]
-RequireAdmin = Annotated[User, Depends(require_role("admin"))]
-RequireMember = Annotated[User, Depends(require_role("member"))]
-RequireLibrarian = Annotated[User, Depends(require_role("librarian"))]
+OptionalAuth = Annotated[Principal | None, Depends(get_optional_principal)]
+RequireAuth = Annotated[Principal, Depends(get_current_active_principal)]
+RequireUser = Annotated[User, Depends(get_current_active_user)]
+RequireAuthWS = Annotated[Principal, Depends(get_current_principal_ws)]
+RequireAdmin = Annotated[Principal, Depends(require_role("admin"))]
+RequireMember = Annotated[Principal, Depends(require_role("member"))]
+RequireLibrarian = Annotated[Principal, Depends(require_role("librarian"))]
 RequirePartialAuth = Annotated[User, Depends(get_user_from_partial_token)]
-RequireStaff = Annotated[User, Depends(require_any_role(["admin", "librarian"]))]
-RequireStaffWS = Annotated[User, Depends(require_any_role_ws(["admin", "librarian"]))]
+RequireStaff = Annotated[Principal, Depends(require_any_role(["admin", "librarian"]))]
+RequireStaffWS = Annotated[Principal, Depends(require_any_role_ws(["admin", "librarian"]))]
 
 
-def is_user_staff(user: User) -> bool:
+def is_user_staff(principal: Principal) -> bool:
     """Проверяет, является ли пользователь сотрудником (admin или librarian)"""
-    roles = {role.name for role in user.roles}
-    return bool(roles & {"admin", "librarian"})
+    return principal.has_any_role({"admin", "librarian"})
 
 
-def is_user_admin(user: User) -> bool:
+def is_user_admin(principal: Principal) -> bool:
     """Проверяет, является ли пользователь администратором"""
-    roles = {role.name for role in user.roles}
-    return "admin" in roles
+    return "admin" in principal.roles
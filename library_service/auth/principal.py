@@ -0,0 +1,111 @@
+"""Модуль кэша субъектов авторизации"""
+
+from dataclasses import dataclass
+from time import monotonic
+import threading
+
+from sqlalchemy import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from library_service.models.db import Role, User, UserRoleLink
+from library_service.settings import async_engine, PRINCIPAL_CACHE_TTL, PRINCIPAL_CACHE_SIZE
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Неизменяемый снимок пользователя, достаточный для проверки доступа"""
+
+    id: int
+    username: str
+    is_active: bool
+    roles: frozenset[str]
+
+    def has_any_role(self, roles: set[str] | frozenset[str]) -> bool:
+        """Проверяет наличие хотя бы одной из ролей"""
+        return not self.roles.isdisjoint(roles)
+
+
+class PrincipalCache:
+    """Кэш субъектов с ограниченным временем жизни записей"""
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: dict[int, tuple[float, Principal]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Principal | None:
+        """Возвращает субъекта из кэша, если запись не устарела"""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires, principal = entry
+        if expires < monotonic():
+            with self._lock:
+                if self._entries.get(user_id) is entry:
+                    del self._entries[user_id]
+            return None
+        return principal
+
+    def put(self, principal: Principal) -> None:
+        """Сохраняет субъекта в кэш"""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[principal.id] = (monotonic() + self.ttl, principal)
+
+    def invalidate(self, user_id: int) -> None:
+        """Удаляет запись пользователя из кэша"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Очищает кэш"""
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL, PRINCIPAL_CACHE_SIZE)
+
+
+async def load_principal(user_id: int) -> Principal | None:
+    """Загружает пользователя и имена его ролей одним запросом"""
+    statement = (
+        select(
+            User.id,
+            User.username,
+            User.is_active,
+            func.array_remove(func.array_agg(Role.name), None).label("roles"),
+        )
+        .outerjoin(UserRoleLink, UserRoleLink.user_id == User.id)  # ty: ignore[invalid-argument-type]
+        .outerjoin(Role, Role.id == UserRoleLink.role_id)  # ty: ignore[invalid-argument-type]
+        .where(User.id == user_id)
+        .group_by(User.id)  # ty: ignore[invalid-argument-type]
+    )
+    async with AsyncSession(async_engine) as session:
+        row = (await session.exec(statement)).first()  # ty: ignore[no-matching-overload]
+    if row is None:
+        return None
+    return Principal(
+        id=row.id,
+        username=row.username,
+        is_active=row.is_active,
+        roles=frozenset(row.roles),
+    )
+
+
+async def get_principal(user_id: int) -> Principal | None:
+    """Возвращает субъекта из кэша или загружает его из базы данных"""
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        principal = await load_principal(user_id)
+        if principal is not None:
+            principal_cache.put(principal)
+    return principal
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Сбрасывает кэшированного субъекта после изменения пользователя или его ролей"""
+    principal_cache.invalidate(user_id)
@@ -0,0 +1,149 @@
+"""Модуль запуска сервиса из командной строки"""
+import argparse, logging.config, os, threading
+
+from sqlmodel import Session
+
+from library_service.settings import (
+    LOGGING_CONFIG,
+    WEB_CONCURRENCY,
+    IMPORT_BATCH_SIZE,
+    COVER_WORKERS,
+    engine,
+    get_logger,
+)
+
+
+def run_prepare(args: argparse.Namespace) -> None:
+    """Выполняет подготовку базы данных, моделей и эмбеддингов"""
+    from library_service.prepare import prepare
+
+    logging.config.dictConfig(LOGGING_CONFIG)
+    prepare(embeddings=not args.skip_embeddings)
+
+
+def run_serve(args: argparse.Namespace) -> None:
+    """Выполняет подготовку один раз и запускает воркеры, которые сразу обслуживают запросы (эмбеддинги — в фоне)"""
+    import uvicorn
+
+    if not args.skip_prepare:
+        from library_service.prepare import prepare, prepare_embeddings
+
+        logging.config.dictConfig(LOGGING_CONFIG)
+        prepare(embeddings=False)
+        engine.dispose()
+        if not args.skip_embeddings:
+            # Эмбеддинги и векторный индекс готовятся в фоне, пока воркеры уже принимают запросы
+            threading.Thread(target=prepare_embeddings, args=(False,), name="prepare-embeddings", daemon=True).start()
+
+    # Воркеры uvicorn импортируют приложение заново и читают этот флаг из окружения
+    os.environ["SKIP_PREPARE"] = "true"
+    get_logger().info(f"[+] Starting {args.workers} workers...")
+
+    uvicorn.run(
+        "library_service.main:app",
+        host=args.host, port=args.port,
+        workers=args.workers,
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+        log_config=LOGGING_CONFIG,
+        access_log=False,
+    )
+
+
+def run_import_books(args: argparse.Namespace) -> None:
+    """Импортирует книги из NDJSON или CSV файла"""
+    from library_service.models.enums import ExportFormat
+    from library_service.services import detect_import_format, parse_import_rows, import_books
+
+    logging.config.dictConfig(LOGGING_CONFIG)
+    logger = get_logger()
+    import_format = ExportFormat(args.format) if args.format else detect_import_format(args.path)
+
+    with open(args.path, encoding="utf-8-sig", newline="") as file, Session(engine) as session:
+        result = import_books(session, parse_import_rows(file, import_format), args.batch_size)
+
+    for error in result.errors:
+        logger.warning(f"[-] Line {error.line}: {error.error}")
+
+
+def run_backfill_previews(args: argparse.Namespace) -> None:
+    """Переносит обложки в подкаталоги и создает уменьшенные копии обложек, загруженных до их появления"""
+    from sqlmodel import col, select
+
+    from library_service.models.db import Book
+    from library_service.services import backfill_renditions, migrate_flat_covers, publish_local_covers
+
+    logging.config.dictConfig(LOGGING_CONFIG)
+    moved = migrate_flat_covers()
+    if moved:
+        get_logger().info(f"[+] Moved {moved} cover files into subdirectories")
+    with Session(engine) as session:
+        preview_ids = list(session.exec(select(Book.preview_id).where(col(Book.preview_id).is_not(None))))
+
+    created, failed = backfill_renditions(preview_ids, args.workers, args.force)  # ty: ignore
+    get_logger().info(f"[+] Renditions created for {created} covers, {failed} failed")
+    published = publish_local_covers(preview_ids)  # ty: ignore
+    if published:
+        get_logger().info(f"[+] Uploaded {published} covers to object storage")
+
+
+def run_build_static(args: argparse.Namespace) -> None:
+    """Собирает статические ассеты с хэшем в имени и их сжатые копии"""
+    from library_service.services import build_static_assets
+
+    logging.config.dictConfig(LOGGING_CONFIG)
+    build_static_assets()
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Возвращает парсер аргументов командной строки"""
+    parser = argparse.ArgumentParser(prog="library_service", description="Управление сервисом библиотеки")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    prepare_parser = commands.add_parser(
+        "prepare", help="Применить миграции, сиды, загрузить модели и сгенерировать эмбеддинги"
+    )
+    prepare_parser.add_argument("--skip-embeddings", action="store_true", help="Не генерировать эмбеддинги")
+    prepare_parser.set_defaults(func=run_prepare)
+
+    serve_parser = commands.add_parser("serve", help="Подготовить сервис и запустить воркеры")
+    serve_parser.add_argument("--host", default="0.0.0.0", help="Адрес (по умолчанию 0.0.0.0)")
+    serve_parser.add_argument("--port", type=int, default=8000, help="Порт (по умолчанию 8000)")
+    serve_parser.add_argument(
+        "--workers", type=int, default=WEB_CONCURRENCY, help="Количество воркеров (по умолчанию WEB_CONCURRENCY)"
+    )
+    serve_parser.add_argument("--skip-prepare", action="store_true", help="Не выполнять подготовку")
+    serve_parser.add_argument("--skip-embeddings", action="store_true", help="Не генерировать эмбеддинги")
+    serve_parser.set_defaults(func=run_serve)
+
+    import_parser = commands.add_parser("import-books", help="Импортировать книги из NDJSON или CSV файла")
+    import_parser.add_argument("path", help="Путь к файлу")
+    import_parser.add_argument(
+        "--format", choices=["ndjson", "csv"], default=None, help="Формат файла (по умолчанию по расширению)"
+    )
+    import_parser.add_argument(
+        "--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Размер пачки (по умолчанию IMPORT_BATCH_SIZE)"
+    )
+    import_parser.set_defaults(func=run_import_books)
+
+    backfill_parser = commands.add_parser("backfill-previews", help="Разложить обложки по подкаталогам и создать их уменьшенные копии")
+    backfill_parser.add_argument(
+        "--workers", type=int, default=COVER_WORKERS, help="Количество процессов (по умолчанию COVER_WORKERS)"
+    )
+    backfill_parser.add_argument("--force", action="store_true", help="Пересоздать уже существующие копии")
+    backfill_parser.set_defaults(func=run_backfill_previews)
+
+    static_parser = commands.add_parser("build-static", help="Собрать статические ассеты (хэш в имени, .br/.gz копии)")
+    static_parser.set_defaults(func=run_build_static)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Точка входа командной строки"""
+    args = get_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
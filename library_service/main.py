@@ -1,29 +1,34 @@
 """Основной модуль"""
-from library_service.services.embeddings import ensure_embeddings
-from starlette.middleware.base import BaseHTTPMiddleware
+from library_service.services.embedding_queue import embedding_worker
+from library_service.services.loan_stats import loan_stats_worker
+from library_service.services.cover_processing import cover_task_worker, cover_transcoder
 
 import asyncio, sys, traceback
 from contextlib import asynccontextmanager
-from pathlib import Path
 
-from alembic import command
-from alembic.config import Config
 from fastapi import status, Request, Response, HTTPException
 from fastapi.staticfiles import StaticFiles
-from ollama import Client, ResponseError
-from sqlmodel import Session
 
-from library_service.auth import run_seeds
+from library_service.prepare import prepare, prepare_embeddings
 from library_service.routers import api_router
 from library_service.services.captcha import limiter, cleanup_task, require_captcha
-from library_service.middlewares import catch_exception_middleware, log_request_middleware, not_found_handler
+from library_service.services.image_processing import PREVIEW_FORMATS
+from library_service.middlewares import (
+    CompressionMiddleware,
+    ImmutableStaticFiles,
+    PrecompressedStaticFiles,
+    CatchExceptionMiddleware,
+    LogRequestMiddleware,
+    not_found_handler,
+)
 from library_service.settings import (
+    BOOKS_PREVIEW_DIR,
+    STATIC_ASSETS_DIR,
+    STATIC_DIR,
     LOGGING_CONFIG,
-    engine,
     get_app,
     get_logger,
-    OLLAMA_URL,
-    ASSISTANT_LLM, EMBEDDINGS_MODEL, REGENERATE_EMBEDDINGS_FORCE, SKIP_REGENERATE_EMBEDDINGS,
+    skip_prepare,
 )
 
 
@@ -31,58 +36,51 @@ from library_service.settings import (
 async def lifespan(_):
     """Жизненный цикл сервиса"""
     logger = get_logger()
-    logger.info("[+] Initializing database...")
-
-    try:
-        with engine.begin() as connection:
-            alembic_cfg = Config("alembic.ini")
-            alembic_cfg.attributes["configure_logging"] = False
-            alembic_cfg.attributes["connection"] = connection
-            command.upgrade(alembic_cfg, "head")
-    except Exception as e:
-        logger.error(f"[-] Migration failed: {e}")
-        raise e
-
-    logger.info("[+] Running seeds...")
-    try:
-        with Session(engine) as session:
-            run_seeds(session)
-        logger.info("[+] Database setup completed.")
-    except Exception as e:
-        logger.error(f"[-] Seeding failed: {e}")
-
-    logger.info("[+] Loading ollama models...")
-    try:
-        ollama_client = Client(host=OLLAMA_URL)
-        ollama_client.pull(EMBEDDINGS_MODEL)
-
-        if ASSISTANT_LLM:
-            ollama_client.pull(ASSISTANT_LLM)
-        else:
-            logger.info("[=] AI-assistant is not available")
 
-    except ResponseError as e:
-        logger.error(f"[-] Failed to pull models {e}")
-
-    ensure_embeddings(REGENERATE_EMBEDDINGS_FORCE, SKIP_REGENERATE_EMBEDDINGS)
+    if skip_prepare():
+        logger.info("[=] Startup preparation is done by launcher")
+    else:
+        await asyncio.to_thread(prepare, False)
+        asyncio.create_task(asyncio.to_thread(prepare_embeddings, False))
 
+    asyncio.create_task(embedding_worker())
     asyncio.create_task(cleanup_task())
+    asyncio.create_task(loan_stats_worker())
+    asyncio.create_task(cover_task_worker())
     logger.info("[+] Starting application...")
     yield  # Обработка запросов
+    cover_transcoder.shutdown()
     logger.info("[+] Application shutdown")
 
 
 app = get_app(lifespan)
-app.add_middleware(BaseHTTPMiddleware, dispatch=log_request_middleware)  # type: ignore[arg-type]
-app.add_middleware(BaseHTTPMiddleware, dispatch=catch_exception_middleware)  # type: ignore[arg-type]
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(LogRequestMiddleware)
+app.add_middleware(CatchExceptionMiddleware)
 app.add_exception_handler(status.HTTP_404_NOT_FOUND, not_found_handler)  # type: ignore[arg-type]
 
 
 # Подключение маршрутов
 app.include_router(api_router)
+# Обложки названы хэшем содержимого и не меняются, поэтому кэшируются навсегда.
+# При COVER_STORAGE=s3 здесь только рабочий каталог, а обложки отдаются по COVER_PUBLIC_URL
+app.mount(
+    "/static/books",
+    ImmutableStaticFiles(
+        directory=BOOKS_PREVIEW_DIR,
+        extensions=frozenset(f".{ext}" for ext in PREVIEW_FORMATS.values()),
+    ),
+    name="books_previews",
+)
+# Собранные ассеты с хэшем в имени и заранее сжатыми копиями (см. build-static)
+app.mount(
+    "/static/dist",
+    PrecompressedStaticFiles(directory=STATIC_ASSETS_DIR),
+    name="static_assets",
+)
 app.mount(
     "/static",
-    StaticFiles(directory=Path(__file__).parent / "static"),
+    StaticFiles(directory=STATIC_DIR),
     name="static",
 )
 
@@ -1,10 +1,16 @@
 """Пакет middleware"""
-from .catch_exception import catch_exception_middleware
-from .log_request import log_request_middleware
+from .catch_exception import CatchExceptionMiddleware
+from .compression import CompressionMiddleware, skip_compression
+from .log_request import LogRequestMiddleware
 from .not_found_handler import not_found_handler
+from .static_files import ImmutableStaticFiles, PrecompressedStaticFiles
 
 __all__ = [
-    "catch_exception_middleware",
-    "log_request_middleware",
+    "CompressionMiddleware",
+    "skip_compression",
+    "ImmutableStaticFiles",
+    "PrecompressedStaticFiles",
+    "CatchExceptionMiddleware",
+    "LogRequestMiddleware",
     "not_found_handler",
 ]
@@ -1,27 +1,43 @@
-import sys
-
-from fastapi import Request, Response, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import status
 from fastapi.responses import JSONResponse
+from starlette.datastructures import URL
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from library_service.settings import get_logger
 
 
-async def catch_exception_middleware(request: Request, call_next):
-    """Middleware для подробного json-описания Internal error"""
-    try:
-        return await call_next(request)
-    except Exception as exc:
-        exc_type, exc_value, exc_tb = sys.exc_info()
-        logger = get_logger()
-        logger.exception(exc)
-
-        return JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={
-                "message": str(exc),
-                "type": exc_type.__name__ if exc_type else "Unknown",
-                "path": str(request.url),
-                "method": request.method,
-            },
-        )
+class CatchExceptionMiddleware:
+    """ASGI middleware для подробного json-описания Internal error"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            get_logger().exception(exc)
+            if response_started:  # заголовки уже отправлены, ответ заменить нельзя
+                raise
+            response = JSONResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content={
+                    "message": str(exc),
+                    "type": type(exc).__name__,
+                    "path": str(URL(scope=scope)),
+                    "method": scope["method"],
+                },
+            )
+            await response(scope, receive, send)
@@ -0,0 +1,223 @@
+import zlib
+from typing import Callable, Iterable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from library_service.settings import (
+    get_logger,
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_ENCODINGS,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MIN_SIZE,
+    COMPRESSION_ZSTD_LEVEL,
+)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Сжимаемые типы содержимого (изображения, шрифты и архивы уже сжаты)
+COMPRESSIBLE_TYPES = frozenset({
+    "application/javascript",
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "image/svg+xml",
+})
+
+
+def accept_encoding_qualities(accept_encoding: str | None) -> dict[str, float]:
+    """Разбирает заголовок Accept-Encoding в словарь кодировка -> q"""
+    qualities = {}
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def is_compressible(content_type: str | None) -> bool:
+    """Проверяет, имеет ли смысл сжимать ответ с таким типом содержимого"""
+    media_type = (content_type or "").partition(";")[0].strip().lower()
+    if media_type == "text/event-stream":
+        return False
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+def skip_compression(endpoint: Callable) -> Callable:
+    """Декоратор эндпоинта, отключающий сжатие его ответов"""
+    endpoint.skip_compression = True
+    return endpoint
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def encode(self, data: bytes, final: bool) -> bytes:
+        mode = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(mode)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def encode(self, data: bytes, final: bool) -> bytes:
+        chunk = self._compressor.process(data)
+        return chunk + (self._compressor.finish() if final else self._compressor.flush())
+
+
+class _ZstdEncoder:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def encode(self, data: bytes, final: bool) -> bytes:
+        mode = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return self._compressor.compress(data) + self._compressor.flush(mode)
+
+
+def available_encoders() -> dict[str, Callable[[], object]]:
+    """Фабрики кодировщиков для установленных библиотек сжатия"""
+    encoders: dict[str, Callable[[], object]] = {"gzip": lambda: _GzipEncoder(COMPRESSION_GZIP_LEVEL)}
+    if brotli is not None:
+        encoders["br"] = lambda: _BrotliEncoder(COMPRESSION_BROTLI_QUALITY)
+    if zstandard is not None:
+        encoders["zstd"] = lambda: _ZstdEncoder(COMPRESSION_ZSTD_LEVEL)
+    return encoders
+
+
+class CompressionMiddleware:
+    """ASGI middleware сжатия ответов в zstd, br или gzip по Accept-Encoding клиента"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: Iterable[str] = COMPRESSION_ENCODINGS,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        encoders = available_encoders()
+        self.encodings = [encoding for encoding in encodings if encoding in encoders]
+        self.encoders = {encoding: encoders[encoding] for encoding in self.encodings}
+        missing = [encoding for encoding in encodings if encoding not in encoders]
+        if missing:
+            get_logger().warning(f"[-] Compression encodings not available: {', '.join(missing)}")
+
+    def select_encoding(self, accept_encoding: str | None) -> str | None:
+        """Выбирает кодировку с наибольшим q клиента (при равенстве — по порядку предпочтения)"""
+        qualities = accept_encoding_qualities(accept_encoding)
+        best, best_quality = None, 0.0
+        for encoding in self.encodings:
+            quality = qualities.get(encoding, qualities.get("*", 0.0))
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.select_encoding(Headers(scope=scope).get("accept-encoding"))
+        responder = _CompressionResponder(scope, send, encoding, self.encoders.get(encoding), self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Сжимает тело одного ответа, не буферизуя потоковые ответы"""
+
+    def __init__(self, scope: Scope, send: Send, encoding: str | None, encoder_factory, minimum_size: int):
+        self.scope = scope
+        self._send = send
+        self.encoding = encoding
+        self.encoder_factory = encoder_factory
+        self.minimum_size = minimum_size
+        self.start_message: Message | None = None
+        self.encoder = None
+        self.passthrough = False
+
+    def _eligible(self, headers: MutableHeaders) -> bool:
+        status = self.start_message["status"]
+        if status < 200 or status in (204, 304) or "content-encoding" in headers:
+            return False
+        if getattr(self.scope.get("endpoint"), "skip_compression", False):
+            return False
+        return is_compressible(headers.get("content-type"))
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = MutableHeaders(scope=message)
+            if not self._eligible(headers):
+                self.passthrough = True
+                await self._send(message)
+                return
+            headers.add_vary_header("Accept-Encoding")
+            content_length = headers.get("content-length")
+            if self.encoder_factory is None or (content_length and int(content_length) < self.minimum_size):
+                self.passthrough = True
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body":
+            if self.encoder is None:  # например, http.response.pathsend: отдаем ответ без сжатия
+                self.passthrough = True
+                await self._send(self.start_message)
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is None:
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+            self.encoder = self.encoder_factory()
+            headers = MutableHeaders(scope=self.start_message)
+            headers["Content-Encoding"] = self.encoding
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"  # сжатое представление не совпадает с исходным побайтно
+            del headers["content-length"]
+            if not more_body:
+                body = self.encoder.encode(body, final=True)
+                headers["Content-Length"] = str(len(body))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            await self._send(self.start_message)
+
+        await self._send({
+            "type": "http.response.body",
+            "body": self.encoder.encode(body, final=not more_body),
+            "more_body": more_body,
+        })
@@ -1,8 +1,9 @@
-from datetime import datetime
+import logging
 from time import perf_counter
 from uuid import uuid4
 
-from fastapi import Request, Response, status
+from starlette.datastructures import Headers, URL
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from library_service.settings import get_logger
 
@@ -10,63 +11,84 @@ from library_service.settings import get_logger
 SKIP_LOGGING_PATHS = frozenset({"/favicon.ico", "/favicon.svg"})
 
 
-async def log_request_middleware(request: Request, call_next):
-    """Middleware для логирования HTTP-запросов"""
-    path = request.url.path
-    if path.startswith("/static") or path in SKIP_LOGGING_PATHS:
-        return await call_next(request)
+class LogRequestMiddleware:
+    """ASGI middleware для логирования HTTP-запросов"""
 
-    logger = get_logger()
-    request_id = uuid4().hex[:8]
-    timestamp = datetime.now().isoformat()
-    method = request.method
-    url = str(request.url)
-    user_agent = request.headers.get("user-agent", "Unknown")
-    client_ip = request.client.host if request.client else None
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.logger = get_logger()
 
-    start_time = perf_counter()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or path.startswith("/static")
+            or path in SKIP_LOGGING_PATHS
+            or not self.logger.isEnabledFor(logging.INFO)
+        ):
+            await self.app(scope, receive, send)
+            return
 
-    try:
-        logger.debug(
-            f"[{request_id}] Starting: {method} {url}",
-            extra={"request_id": request_id, "user_agent": user_agent},
-        )
+        start_time = perf_counter()
+        request_id = uuid4().hex[:8]
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("[%s] Starting: %s %s", request_id, scope["method"], URL(scope=scope))
+        status_code = 500
+        response_started = False
 
-        response: Response = await call_next(request)
-        process_time = perf_counter() - start_time
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_started = True
+            await send(message)
 
-        logger.info(
-            f"[{request_id}] {method} {url} - {response.status_code} - {process_time:.4f}s",
-            extra={
-                "request_id": request_id,
-                "timestamp": timestamp,
-                "method": method,
-                "url": url,
-                "status": response.status_code,
-                "process_time": process_time,
-                "client_ip": client_ip,
-                "user_agent": user_agent,
-            },
-        )
-        return response
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            self._log(scope, request_id, start_time, logging.ERROR, status_code, e)
+            if response_started:
+                raise
+            await send({
+                "type": "http.response.start",
+                "status": 500,
+                "headers": [(b"content-type", b"text/plain; charset=utf-8")],
+            })
+            await send({"type": "http.response.body", "body": b"Internal Server Error"})
+            return
+        self._log(scope, request_id, start_time, logging.INFO, status_code)
 
-    except Exception as e:
+    def _log(
+        self,
+        scope: Scope,
+        request_id: str,
+        start_time: float,
+        level: int,
+        status_code: int,
+        error: Exception | None = None,
+    ) -> None:
+        """Записывает завершенный запрос в журнал (время — до отправки последней части тела)"""
         process_time = perf_counter() - start_time
-        logger.error(
-            f"[{request_id}] {method} {url} - Error: {e} - {process_time:.4f}s",
-            extra={
-                "request_id": request_id,
-                "timestamp": timestamp,
-                "method": method,
-                "url": url,
-                "error": str(e),
-                "process_time": process_time,
-                "client_ip": client_ip,
-                "user_agent": user_agent,
-            },
-            exc_info=True,
-        )
-        return Response(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content="Internal Server Error",
-        )
+        method = scope["method"]
+        url = str(URL(scope=scope))
+        headers = Headers(scope=scope)
+        client = scope.get("client")
+        extra = {
+            "request_id": request_id,
+            "method": method,
+            "url": url,
+            "process_time": process_time,
+            "client_ip": client[0] if client else None,
+            "user_agent": headers.get("user-agent", "Unknown"),
+        }
+        if error is None:
+            extra["status"] = status_code
+            self.logger.log(
+                level, "[%s] %s %s - %s - %.4fs", request_id, method, url, status_code, process_time, extra=extra
+            )
+        else:
+            extra["error"] = str(error)
+            self.logger.log(
+                level, "[%s] %s %s - Error: %s - %.4fs", request_id, method, url, error, process_time,
+                extra=extra, exc_info=error,
+            )
@@ -1,7 +1,7 @@
 from fastapi import Request, Response, status, HTTPException
 from fastapi.responses import JSONResponse
 
-from library_service.settings import get_app
+from library_service.settings import APP_INFO
 from library_service.routers.misc import unknown
 
 
@@ -15,8 +15,7 @@ async def not_found_handler(request: Request, exc: HTTPException):
                 status_code=status.HTTP_404_NOT_FOUND,
                 content={"detail": "API endpoint not found", "path": path},
             )
-        app = get_app()
-        return await unknown(request, app)
+        return await unknown(request, APP_INFO)
 
     return JSONResponse(
         status_code=exc.status_code,
@@ -0,0 +1,83 @@
+import mimetypes
+from os import PathLike, stat_result
+from pathlib import PurePath
+from stat import S_ISREG
+
+from anyio import to_thread
+from fastapi import HTTPException, Response, status
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+from .compression import accept_encoding_qualities
+
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Заранее сжатые копии в порядке предпочтения: (Content-Encoding, расширение)
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """Раздача неизменяемых файлов (имя определяется содержимым) с долгим кэшированием"""
+
+    def __init__(self, *args, extensions: frozenset[str] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.extensions = extensions
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if self.extensions is not None and PurePath(path).suffix not in self.extensions:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        return await super().get_response(path, scope)
+
+    def file_response(
+        self,
+        full_path: PathLike,
+        stat_result: stat_result,
+        scope: Scope,
+        status_code: int = 200,
+        headers: dict[str, str] | None = None,
+        media_type: str | None = None,
+    ) -> Response:
+        # Имя файла определяется содержимым, поэтому служит строгим ETag
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            media_type=media_type,
+            headers={
+                "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+                "ETag": f'"{PurePath(full_path).name}"',
+                **(headers or {}),
+            },
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+class PrecompressedStaticFiles(ImmutableStaticFiles):
+    """Раздача собранных ассетов: выбирает .br/.gz копию по Accept-Encoding клиента"""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if PurePath(path).suffix in {suffix for _, suffix in PRECOMPRESSED_ENCODINGS}:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        if scope["method"] in ("GET", "HEAD"):
+            qualities = accept_encoding_qualities(Headers(scope=scope).get("accept-encoding"))
+            for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+                if qualities.get(encoding, 0) <= 0:
+                    continue
+                full_path, stat_result = await to_thread.run_sync(self.lookup_path, path + suffix)
+                if stat_result is not None and S_ISREG(stat_result.st_mode):
+                    return self.file_response(
+                        full_path,
+                        stat_result,
+                        scope,
+                        headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+                        media_type=mimetypes.guess_type(path)[0] or "application/octet-stream",
+                    )
+        response = await super().get_response(path, scope)
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
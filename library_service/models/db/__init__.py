@@ -4,6 +4,13 @@ from .book import Book
 from .genre import Genre
 from .role import Role
 from .user import User
+from .search_embedding import SearchEmbedding
+from .embedding_checkpoint import EmbeddingCheckpoint
+from .embedding_job import EmbeddingJob
+from .captcha_token import CaptchaToken
+from .catalogue_change import CatalogueChange
+from .loan_daily_stat import LoanDailyStat
+from .cover_task import CoverTask
 from .links import (
     AuthorBookLink,
     GenreBookLink,
@@ -17,6 +24,13 @@ __all__ = [
     "Genre",
     "Role",
     "User",
+    "SearchEmbedding",
+    "EmbeddingCheckpoint",
+    "EmbeddingJob",
+    "CaptchaToken",
+    "CatalogueChange",
+    "LoanDailyStat",
+    "CoverTask",
     "AuthorBookLink",
     "GenreBookLink",
     "BookUserLink",
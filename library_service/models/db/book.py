@@ -1,10 +1,9 @@
 """Модуль DB-моделей книг"""
 
 from typing import TYPE_CHECKING, List
-from uuid import UUID
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Index, String
 from sqlmodel import Field, Relationship
 
 from library_service.models.dto.book import BookBase
@@ -19,6 +18,17 @@ if TYPE_CHECKING:
 class Book(BookBase, table=True):
     """Модель книги в базе данных"""
 
+    # Векторный индекс ix_book_embedding не объявлен в модели: его тип и параметры
+    # задаются настройками, а создает и перестраивает его services/vector_index.py
+    __table_args__ = (
+        Index(
+            "ix_book_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
+
     id: int | None = Field(
         default=None, primary_key=True, index=True, description="Идентификатор"
     )
@@ -28,7 +38,12 @@ class Book(BookBase, table=True):
         description="Статус",
     )
     embedding: list[float] | None = Field(sa_column=Column(Vector(1024)), description="Эмбэдинг для векторного поиска")
-    preview_id: UUID | None = Field(default=None, unique=True, index=True, description="UUID файла изображения")
+    embedding_source_hash: str | None = Field(
+        default=None, max_length=64, description="Хэш модели и текста, по которым построен эмбэдинг"
+    )
+    preview_id: str | None = Field(
+        default=None, max_length=64, index=True, description="Хэш содержимого файла изображения"
+    )
     authors: List["Author"] = Relationship(
         back_populates="books", link_model=AuthorBookLink
     )
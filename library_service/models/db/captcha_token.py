@@ -0,0 +1,19 @@
+"""Модуль DB-моделей токенов CAPTCHA"""
+
+from sqlalchemy import BigInteger, Column
+from sqlmodel import SQLModel, Field
+
+
+class CaptchaToken(SQLModel, table=True):
+    """Модель выданной задачи или токена прохождения CAPTCHA (общие для всех воркеров)"""
+
+    __tablename__ = "captcha_tokens"
+
+    token: str = Field(primary_key=True, description="Токен")
+    kind: str = Field(description="Тип токена (challenge или redeem)")
+    ip: str | None = Field(default=None, index=True, description="IP-адрес клиента")
+    redeem_token: str | None = Field(default=None, description="Токен прохождения для решенной задачи")
+    expires: int = Field(
+        sa_column=Column(BigInteger, nullable=False, index=True),
+        description="Время истечения (мс)",
+    )
@@ -0,0 +1,18 @@
+"""Модуль DB-моделей изменений каталога"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime
+from sqlmodel import SQLModel, Field
+
+
+class CatalogueChange(SQLModel, table=True):
+    """Модель времени последнего изменения таблицы каталога (обновляется триггерами)"""
+
+    __tablename__ = "catalogue_changes"
+
+    entity: str = Field(primary_key=True, description="Имя таблицы")
+    changed_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+        description="Дата и время последнего изменения",
+    )
@@ -0,0 +1,33 @@
+"""Модуль DB-моделей задач обработки обложек"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, String
+from sqlmodel import SQLModel, Field
+
+from library_service.models.enums import CoverTaskStatus
+
+
+class CoverTask(SQLModel, table=True):
+    """Модель задачи обработки загруженной обложки (общая для всех реплик)"""
+
+    __tablename__ = "cover_tasks"
+
+    book_id: int = Field(
+        foreign_key="book.id",
+        ondelete="CASCADE",
+        primary_key=True,
+        description="Идентификатор книги",
+    )
+    preview_id: str = Field(primary_key=True, max_length=64, description="Хэш содержимого загруженной обложки")
+    status: CoverTaskStatus = Field(
+        default=CoverTaskStatus.PENDING,
+        sa_column=Column(String, nullable=False, default="pending"),
+        description="Статус",
+    )
+    error: str | None = Field(default=None, description="Ошибка обработки")
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        index=True,
+        description="Дата и время последнего изменения статуса",
+    )
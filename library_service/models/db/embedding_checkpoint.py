@@ -0,0 +1,20 @@
+"""Модуль DB-моделей контрольных точек генерации эмбеддингов"""
+
+from datetime import datetime, timezone
+
+from sqlmodel import SQLModel, Field
+
+
+class EmbeddingCheckpoint(SQLModel, table=True):
+    """Модель контрольной точки пакетной генерации эмбеддингов"""
+
+    __tablename__ = "embedding_checkpoints"
+
+    name: str = Field(primary_key=True, description="Название задачи")
+    force: bool = Field(default=False, description="Принудительная перегенерация")
+    last_book_id: int = Field(default=0, description="Идентификатор последней обработанной книги")
+    processed: int = Field(default=0, description="Количество обработанных книг")
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="Дата и время последнего обновления",
+    )
@@ -0,0 +1,41 @@
+"""Модуль DB-моделей очереди генерации эмбеддингов"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Index, String
+from sqlmodel import SQLModel, Field
+
+from library_service.models.enums import EmbeddingJobStatus
+
+
+class EmbeddingJob(SQLModel, table=True):
+    """Модель задачи генерации эмбеддинга книги (outbox)"""
+
+    __tablename__ = "embedding_jobs"
+    __table_args__ = (
+        Index("ix_embedding_jobs_status_available_at", "status", "available_at"),
+    )
+
+    id: int | None = Field(default=None, primary_key=True, description="Идентификатор")
+    book_id: int = Field(
+        foreign_key="book.id",
+        ondelete="CASCADE",
+        unique=True,
+        description="Идентификатор книги",
+    )
+    status: EmbeddingJobStatus = Field(
+        default=EmbeddingJobStatus.PENDING,
+        sa_column=Column(String, nullable=False, default="pending"),
+        description="Статус",
+    )
+    revision: int = Field(default=1, description="Номер изменения книги")
+    attempts: int = Field(default=0, description="Количество попыток")
+    last_error: str | None = Field(default=None, description="Последняя ошибка")
+    available_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="Дата и время, после которых задача доступна для обработки",
+    )
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="Дата и время постановки в очередь",
+    )
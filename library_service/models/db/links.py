@@ -1,6 +1,8 @@
 """Модуль связей между сущностями в БД"""
 
 from datetime import datetime, timezone
+
+from sqlalchemy import Index, literal_column, text
 from sqlmodel import SQLModel, Field
 
 
@@ -61,6 +63,17 @@ class BookUserLink(SQLModel, table=True):
     """
 
     __tablename__ = "loans"
+    __table_args__ = (
+        Index("ix_loans_open_due_date", "due_date", postgresql_where=text("returned_at IS NULL")),
+        Index(
+            "uq_loans_active_book",
+            "book_id",
+            unique=True,
+            postgresql_where=text("returned_at IS NULL"),
+        ),
+        Index("ix_loans_user_id_borrowed_at", "user_id", literal_column("borrowed_at").desc()),
+        Index("ix_loans_book_id_borrowed_at", "book_id", literal_column("borrowed_at").desc()),
+    )
 
     id: int | None = Field(
         default=None, primary_key=True, index=True, description="Идентификатор"
@@ -73,9 +86,10 @@ class BookUserLink(SQLModel, table=True):
 
     borrowed_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
+        index=True,
         description="Дата и время выдачи",
     )
     due_date: datetime = Field(description="Дата и время запланированного возврата")
     returned_at: datetime | None = Field(
-        default=None, description="Дата и время фактического возврата"
+        default=None, index=True, description="Дата и время фактического возврата"
     )
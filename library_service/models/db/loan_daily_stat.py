@@ -0,0 +1,23 @@
+"""Модуль DB-моделей дневной статистики выдач"""
+
+from datetime import date
+
+from sqlmodel import SQLModel, Field
+
+
+class LoanDailyStat(SQLModel, table=True):
+    """Модель дневных счетчиков выдач книги (обновляется триггерами на loans)"""
+
+    __tablename__ = "loan_daily_stats"
+
+    day: date = Field(primary_key=True, description="День")
+    book_id: int = Field(
+        foreign_key="book.id",
+        ondelete="CASCADE",
+        primary_key=True,
+        description="Идентификатор книги",
+    )
+    issued: int = Field(default=0, description="Количество выдач за день")
+    returned: int = Field(default=0, description="Количество возвратов за день")
+    closed: int = Field(default=0, description="Количество выданных в этот день и уже возвращенных")
+    overdue: int = Field(default=0, description="Количество просроченных выдач на момент снимка")
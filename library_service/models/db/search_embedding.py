@@ -0,0 +1,24 @@
+"""Модуль DB-моделей кэша поисковых эмбеддингов"""
+
+from datetime import datetime, timezone
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Column
+from sqlmodel import SQLModel, Field
+
+
+class SearchEmbedding(SQLModel, table=True):
+    """Модель сохраненного эмбеддинга поискового запроса"""
+
+    __tablename__ = "search_embeddings"
+
+    query: str = Field(primary_key=True, description="Нормализованный поисковый запрос")
+    model: str = Field(primary_key=True, description="Модель эмбеддингов")
+    embedding: list[float] = Field(
+        sa_column=Column(Vector(1024), nullable=False),
+        description="Эмбеддинг запроса",
+    )
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="Дата и время создания",
+    )
@@ -2,12 +2,23 @@
 
 from .author import AuthorBase, AuthorCreate, AuthorList, AuthorRead, AuthorUpdate
 from .genre import GenreBase, GenreCreate, GenreList, GenreRead, GenreUpdate
-from .book import BookBase, BookCreate, BookList, BookRead, BookUpdate
+from .book import (
+    BookBase,
+    BookCreate,
+    BookList,
+    BookRead,
+    BookUpdate,
+    BookImport,
+    BookImportError,
+    BookImportResult,
+)
 from .role import RoleBase, RoleCreate, RoleList, RoleRead, RoleUpdate
 from .user import UserBase, UserCreate, UserList, UserRead, UserUpdate, UserLogin
 from .loan import LoanBase, LoanCreate, LoanList, LoanRead, LoanUpdate
 from .recovery import RecoveryCodesResponse, RecoveryCodesStatus, RecoveryCodeUse
 from .token import TokenData
+from .embedding_job import EmbeddingJobRead, EmbeddingJobList, EmbeddingJobRetry
+from .relation import RelationSet, BookRelationsUpdate, BookRelationsBatch, RelationsUpdateResult
 from .misc import (
     AuthorWithBooks,
     GenreWithBooks,
@@ -38,6 +49,9 @@ __all__ = [
     "BookUpdate",
     "BookRead",
     "BookList",
+    "BookImport",
+    "BookImportError",
+    "BookImportResult",
     "BookFilteredList",
     "BookStatusUpdate",
     "GenreBase",
@@ -63,6 +77,13 @@ __all__ = [
     "RoleRead",
     "RoleList",
     "TokenData",
+    "EmbeddingJobRead",
+    "EmbeddingJobList",
+    "EmbeddingJobRetry",
+    "RelationSet",
+    "BookRelationsUpdate",
+    "BookRelationsBatch",
+    "RelationsUpdateResult",
     "TOTPSetupResponse",
     "TOTPVerifyRequest",
     "TOTPDisableRequest",
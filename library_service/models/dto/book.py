@@ -2,7 +2,7 @@
 
 from typing import List
 
-from pydantic import ConfigDict
+from pydantic import ConfigDict, field_validator
 from sqlmodel import SQLModel, Field
 
 from library_service.models.enums import BookStatus
@@ -53,4 +53,40 @@ class BookList(SQLModel):
     """Список книг"""
 
     books: List[BookRead] = Field(description="Список книг")
-    total: int = Field(description="Количество книг")
+    total: int = Field(description="Количество книг на странице")
+    next_after_id: int | None = Field(None, description="Курсор следующей страницы")
+
+
+class BookImport(BookBase):
+    """Модель книги для массового импорта (авторы и жанры указываются по имени)"""
+
+    status: BookStatus = Field(BookStatus.ACTIVE, description="Статус")
+    authors: List[str] = Field(default_factory=list, description="Имена авторов")
+    genres: List[str] = Field(default_factory=list, description="Названия жанров")
+
+    @field_validator("authors", "genres", mode="before")
+    @classmethod
+    def split_names(cls, v):
+        if v is None:
+            return []
+        if isinstance(v, str):
+            v = v.split(";")
+        names = [item.get("name") if isinstance(item, dict) else item for item in v]
+        return list(dict.fromkeys(name.strip() for name in names if isinstance(name, str) and name.strip()))
+
+
+class BookImportError(SQLModel):
+    """Ошибка строки массового импорта"""
+
+    line: int = Field(description="Номер строки")
+    error: str = Field(description="Описание ошибки")
+
+
+class BookImportResult(SQLModel):
+    """Результат массового импорта книг"""
+
+    imported: int = Field(description="Количество импортированных книг")
+    skipped: int = Field(description="Количество пропущенных строк")
+    authors_created: int = Field(description="Количество созданных авторов")
+    genres_created: int = Field(description="Количество созданных жанров")
+    errors: List[BookImportError] = Field(default_factory=list, description="Ошибки строк (первые из них)")
@@ -0,0 +1,36 @@
+"""Модуль DTO для очереди генерации эмбеддингов"""
+
+from datetime import datetime
+from typing import List
+
+from sqlmodel import SQLModel, Field
+
+from library_service.models.enums import EmbeddingJobStatus
+
+
+class EmbeddingJobRead(SQLModel):
+    """Модель задачи генерации эмбеддинга для чтения"""
+
+    id: int = Field(description="Идентификатор")
+    book_id: int = Field(description="Идентификатор книги")
+    book_title: str = Field(description="Название книги")
+    status: EmbeddingJobStatus = Field(description="Статус")
+    attempts: int = Field(description="Количество попыток")
+    last_error: str | None = Field(None, description="Последняя ошибка")
+    available_at: datetime = Field(description="Дата и время следующей попытки")
+    created_at: datetime = Field(description="Дата и время постановки в очередь")
+
+
+class EmbeddingJobList(SQLModel):
+    """Список задач генерации эмбеддингов"""
+
+    jobs: List[EmbeddingJobRead] = Field(description="Список задач")
+    total: int = Field(description="Количество задач")
+
+
+class EmbeddingJobRetry(SQLModel):
+    """Модель повторного запуска задач генерации эмбеддингов"""
+
+    book_ids: List[int] | None = Field(
+        None, description="Идентификаторы книг (все неудачные задачи, если не указаны)"
+    )
@@ -46,4 +46,6 @@ class LoanList(SQLModel):
     """Список выдач"""
 
     loans: List[LoanRead] = Field(description="Список выдач")
-    total: int = Field(description="Количество выдач")
+    total: int | None = Field(None, description="Количество выдач (если запрошено)")
+    total_estimated: bool = Field(False, description="Количество выдач оценено планировщиком")
+    next_cursor: str | None = Field(None, description="Курсор следующей страницы")
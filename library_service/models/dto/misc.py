@@ -78,7 +78,9 @@ class BookFilteredList(SQLModel):
     books: List[BookWithAuthorsAndGenres] = Field(
         description="Список отфильтрованных книг"
     )
-    total: int = Field(description="Количество книг")
+    total: int | None = Field(None, description="Количество книг (если запрошено)")
+    total_estimated: bool = Field(False, description="Количество книг оценено планировщиком")
+    next_cursor: str | None = Field(None, description="Курсор следующей страницы")
 
 
 class LoanWithBook(LoanRead):
@@ -0,0 +1,32 @@
+"""Модуль DTO-моделей связей"""
+
+from typing import List
+
+from sqlmodel import SQLModel, Field
+
+
+class RelationSet(SQLModel):
+    """Полный набор связанных сущностей книги"""
+
+    ids: List[int] = Field(description="Идентификаторы связанных сущностей")
+
+
+class BookRelationsUpdate(SQLModel):
+    """Новые наборы авторов и жанров книги (None — не изменять)"""
+
+    book_id: int = Field(description="Идентификатор книги")
+    author_ids: List[int] | None = Field(None, description="Идентификаторы авторов")
+    genre_ids: List[int] | None = Field(None, description="Идентификаторы жанров")
+
+
+class BookRelationsBatch(SQLModel):
+    """Пакетное изменение связей нескольких книг"""
+
+    books: List[BookRelationsUpdate] = Field(description="Книги и их новые связи")
+
+
+class RelationsUpdateResult(SQLModel):
+    """Результат изменения связей"""
+
+    added: int = Field(description="Количество добавленных связей")
+    removed: int = Field(description="Количество удаленных связей")
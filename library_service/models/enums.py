@@ -7,4 +7,30 @@ class BookStatus(str, Enum):
     BORROWED = "borrowed"       
     RESERVED = "reserved"       
     RESTORATION = "restoration" 
-    WRITTEN_OFF = "written_off" 
\ No newline at end of file
+    WRITTEN_OFF = "written_off" 
+
+
+class EmbeddingJobStatus(str, Enum):
+    """Статусы задачи генерации эмбеддинга"""
+    PENDING = "pending"
+    FAILED = "failed"
+
+
+class ExportEntity(str, Enum):
+    """Сущности каталога, доступные для выгрузки"""
+    BOOKS = "books"
+    AUTHORS = "authors"
+    GENRES = "genres"
+
+
+class ExportFormat(str, Enum):
+    """Форматы выгрузки и импорта каталога"""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class CoverTaskStatus(str, Enum):
+    """Статусы обработки загруженной обложки"""
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
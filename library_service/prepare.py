@@ -0,0 +1,113 @@
+"""Модуль подготовки сервиса к запуску"""
+from alembic import command
+from alembic.config import Config
+from ollama import Client, ResponseError
+from sqlalchemy import text
+from sqlmodel import Session
+
+from library_service.auth import run_seeds
+from library_service.services.cover_processing import migrate_flat_covers
+from library_service.services.embeddings import ensure_embeddings
+from library_service.services.static_assets import build_static_assets
+from library_service.services.vector_index import ensure_vector_index
+from library_service.settings import (
+    engine,
+    get_logger,
+    OLLAMA_URL,
+    ASSISTANT_LLM, EMBEDDINGS_MODEL, REGENERATE_EMBEDDINGS_FORCE, SKIP_REGENERATE_EMBEDDINGS,
+)
+
+
+# Ключи advisory-блокировок подготовки и генерации эмбеддингов (общие для всех процессов и реплик)
+PREPARE_LOCK_KEY = 0x4C6942
+EMBEDDINGS_LOCK_KEY = 0x4C6945
+
+
+def run_migrations() -> None:
+    """Применяет миграции базы данных"""
+    logger = get_logger()
+    logger.info("[+] Initializing database...")
+
+    try:
+        with engine.begin() as connection:
+            alembic_cfg = Config("alembic.ini")
+            alembic_cfg.attributes["configure_logging"] = False
+            alembic_cfg.attributes["connection"] = connection
+            command.upgrade(alembic_cfg, "head")
+    except Exception as e:
+        logger.error(f"[-] Migration failed: {e}")
+        raise e
+
+
+def run_seeding() -> None:
+    """Создает роли и учетную запись администратора"""
+    logger = get_logger()
+    logger.info("[+] Running seeds...")
+    try:
+        with Session(engine) as session:
+            run_seeds(session)
+        logger.info("[+] Database setup completed.")
+    except Exception as e:
+        logger.error(f"[-] Seeding failed: {e}")
+
+
+def run_cover_migration() -> None:
+    """Переносит обложки старого формата в подкаталоги до приема запросов"""
+    logger = get_logger()
+    moved = migrate_flat_covers()
+    if moved:
+        logger.info(f"[+] Moved {moved} legacy cover files into subdirectories")
+
+
+def pull_models() -> None:
+    """Загружает модели Ollama"""
+    logger = get_logger()
+    logger.info("[+] Loading ollama models...")
+    try:
+        ollama_client = Client(host=OLLAMA_URL)
+        ollama_client.pull(EMBEDDINGS_MODEL)
+
+        if ASSISTANT_LLM:
+            ollama_client.pull(ASSISTANT_LLM)
+        else:
+            logger.info("[=] AI-assistant is not available")
+
+    except (ResponseError, ConnectionError) as e:
+        logger.error(f"[-] Failed to pull models {e}")
+
+
+def prepare_embeddings(wait: bool = True) -> None:
+    """
+    Генерирует устаревшие эмбеддинги и проверяет векторный индекс под advisory-блокировкой.
+    При wait=False пропускает работу, если ее уже выполняет другой процесс.
+    """
+    logger = get_logger()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if wait:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": EMBEDDINGS_LOCK_KEY})
+        elif not connection.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": EMBEDDINGS_LOCK_KEY}):
+            logger.info("[=] Embeddings are prepared by another process")
+            return
+        try:
+            ensure_embeddings(REGENERATE_EMBEDDINGS_FORCE, SKIP_REGENERATE_EMBEDDINGS)
+            ensure_vector_index()
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": EMBEDDINGS_LOCK_KEY})
+
+
+def prepare(embeddings: bool = True) -> None:
+    """Выполняет подготовку под advisory-блокировкой, чтобы параллельные запуски не конкурировали"""
+    logger = get_logger()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        logger.info("[+] Waiting for prepare lock...")
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": PREPARE_LOCK_KEY})
+        try:
+            run_migrations()
+            run_seeding()
+            run_cover_migration()
+            build_static_assets()
+            pull_models()
+            if embeddings:
+                prepare_embeddings()
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": PREPARE_LOCK_KEY})
@@ -12,6 +12,7 @@ from .cap import router as cap_router
 from .users import router as users_router
 from .misc import router as misc_router
 from .llm import router as llm_router
+from .export import router as export_router
 
 
 api_router = APIRouter()
@@ -28,3 +29,4 @@ api_router.include_router(cap_router, prefix="/api")
 api_router.include_router(users_router, prefix="/api")
 api_router.include_router(relationships_router, prefix="/api")
 api_router.include_router(llm_router, prefix="/api")
+api_router.include_router(export_router, prefix="/api")
@@ -32,7 +32,7 @@ from library_service.models.dto import (
 from library_service.settings import get_session
 from library_service.auth import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
-    RequireAuth,
+    RequireUser,
     RequireAdmin,
     RequireStaff,
     authenticate_user,
@@ -211,7 +211,7 @@ def refresh_token(
     summary="Текущий пользователь",
     description="Получить информацию о текущем авторизованном пользователе",
 )
-def get_my_profile(current_user: RequireAuth):
+def get_my_profile(current_user: RequireUser):
     """Возвращает информацию о текущем пользователе"""
     return UserRead(
         **current_user.model_dump(), roles=[role.name for role in current_user.roles]
@@ -226,7 +226,7 @@ def get_my_profile(current_user: RequireAuth):
 )
 def update_user_me(
     user_update: UserUpdate,
-    current_user: RequireAuth,
+    current_user: RequireUser,
     session: Session = Depends(get_session),
 ):
     """Обновляет профиль текущего пользователя"""
@@ -253,7 +253,7 @@ def update_user_me(
     description="Генерирует секрет и QR-код для настройки TOTP",
 )
 def get_totp_qr_bitmap(
-    current_user: RequireAuth,
+    current_user: RequireUser,
     session: Session = Depends(get_session),
 ):
     """Возвращает данные для настройки TOTP"""
@@ -274,7 +274,7 @@ def get_totp_qr_bitmap(
 )
 def enable_2fa(
     data: TOTPVerifyRequest,
-    current_user: RequireAuth,
+    current_user: RequireUser,
     secret: str = Body(..., embed=True),
     session: Session = Depends(get_session),
 ):
@@ -318,7 +318,7 @@ def enable_2fa(
 )
 def disable_2fa(
     data: TOTPDisableRequest,
-    current_user: RequireAuth,
+    current_user: RequireUser,
     session: Session = Depends(get_session),
 ):
     """Отключает 2FA"""
@@ -394,7 +394,7 @@ def verify_2fa(
     summary="Статус резервных кодов",
     description="Показывает количество оставшихся кодов и какие использованы",
 )
-def get_recovery_codes_status(current_user: RequireAuth):
+def get_recovery_codes_status(current_user: RequireUser):
     """Возвращает статус резервных кодов"""
     return RecoveryCodesStatus(**get_codes_status(current_user))
 
@@ -406,7 +406,7 @@ def get_recovery_codes_status(current_user: RequireAuth):
     description="Генерирует новые коды, старые аннулируются",
 )
 def regenerate_recovery_codes(
-    current_user: RequireAuth,
+    current_user: RequireUser,
     session: Session = Depends(get_session),
 ):
     """Генерирует новые резервные коды"""
@@ -1,10 +1,12 @@
 """Модуль работы с авторами"""
 
 from fastapi import APIRouter, Depends, HTTPException, Path, status
+from sqlalchemy.orm import defer
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from library_service.auth import RequireStaff
-from library_service.settings import get_session
+from library_service.settings import get_async_session, get_session
 from library_service.models.db import Author, AuthorBookLink, Book
 from library_service.models.dto import (
     BookRead,
@@ -44,9 +46,9 @@ def create_author(
     summary="Получить список авторов",
     description="Возвращает список всех авторов в системе",
 )
-def read_authors(session: Session = Depends(get_session)):
+async def read_authors(session: AsyncSession = Depends(get_async_session)):
     """Возвращает список всех авторов"""
-    authors = session.exec(select(Author)).all()
+    authors = (await session.exec(select(Author))).all()
     return AuthorList(
         authors=[AuthorRead(**author.model_dump()) for author in authors],
         total=len(authors),
@@ -59,21 +61,22 @@ def read_authors(session: Session = Depends(get_session)):
     summary="Получить информацию об авторе",
     description="Возвращает информацию об авторе и его книгах",
 )
-def get_author(
+async def get_author(
     author_id: int = Path(..., description="ID автора (целое число, > 0)", gt=0),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """Возвращает информацию об авторе и его книгах"""
-    author = session.get(Author, author_id)
+    author = await session.get(Author, author_id)
     if not author:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Author not found",
         )
 
-    books = session.exec(
-        select(Book).join(AuthorBookLink).where(AuthorBookLink.author_id == author_id)
-    ).all()
+    books = (await session.exec(
+        select(Book).options(defer(Book.embedding))  # ty: ignore
+        .join(AuthorBookLink).where(AuthorBookLink.author_id == author_id)
+    )).all()
 
     book_reads = [BookRead(**book.model_dump()) for book in books]
 
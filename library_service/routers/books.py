@@ -1,20 +1,32 @@
 """Модуль работы с книгами"""
 from typing_extensions import Annotated
 from uuid import uuid4
-import shutil
+import asyncio, io, json
 
 from datetime import datetime, timezone
-from typing import List
+from typing import AsyncIterator, List
 
+import aiofiles
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, status, UploadFile, File
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import Field
 from sqlalchemy import text, case, distinct
 from sqlalchemy.orm import selectinload, defer
 from sqlmodel import Session, select, col, func
-
-from library_service.auth import RequireStaff, OptionalAuth
-from library_service.settings import get_session, BOOKS_PREVIEW_DIR
-from library_service.models.enums import BookStatus
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from library_service.auth import RequireAdmin, RequireStaff, OptionalAuth
+from library_service.settings import (
+    get_session,
+    get_async_session,
+    async_engine,
+    BOOKS_STREAM_BATCH_SIZE,
+    COVER_MAX_SIZE,
+    COVER_UPLOAD_DIR,
+    SEARCH_CANDIDATES,
+    SEARCH_RRF_K,
+)
+from library_service.models.enums import BookStatus, CoverTaskStatus, ExportFormat
 from library_service.models.db import (
     Author,
     AuthorBookLink,
@@ -26,24 +38,71 @@ from library_service.models.db import (
 from library_service.models.dto import (
     AuthorRead,
     BookCreate,
+    BookImportResult,
     BookList,
     BookRead,
     BookUpdate,
     GenreRead,
+    EmbeddingJobList,
+    EmbeddingJobRead,
+    EmbeddingJobRetry,
 )
 from library_service.models.dto.misc import (
     BookWithAuthorsAndGenres,
     BookFilteredList,
 )
 from library_service.services import (
-    transcode_image,
-    generate_book_embedding,
-    generate_search_embedding
+    get_preview_urls,
+    CoverMissing,
+    CoverQueueFull,
+    assign_cover,
+    cover_hasher,
+    cover_transcoder,
+    get_cover_task_status,
+    release_cover,
+    stage_upload,
+    start_cover_task,
+    generate_search_embedding,
+    book_embedding_text,
+    embedding_source_hash,
+    enqueue_embedding_job,
+    detect_import_format,
+    parse_import_rows,
+    import_books,
+    get_embedding_queue_stats,
+    get_failed_embedding_jobs,
+    retry_failed_embedding_jobs,
+    apply_search_params,
+    get_vector_index_status,
+    get_search_cache_stats,
+    get_regeneration_progress,
+    count_rows,
+    decode_cursor,
+    encode_cursor,
+    is_cursor_id,
 )
 
 
 router = APIRouter(prefix="/books", tags=["books"])
 
+# Колонки BookRead, выбираемые без эмбеддинга
+BOOK_READ_COLUMNS = (Book.id, Book.title, Book.description, Book.page_count, Book.status, Book.preview_id)
+
+# Размер блока при потоковой записи загружаемой обложки на диск
+COVER_UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def book_row_to_dict(row) -> dict:
+    """Преобразует строку выборки BOOK_READ_COLUMNS в данные BookRead"""
+    return {
+        "id": row.id,
+        "title": row.title,
+        "description": row.description,
+        "page_count": row.page_count,
+        "status": row.status,
+        "preview_urls": get_preview_urls(row.preview_id),
+    }
+
 
 def close_active_loan(session: Session, book_id: int) -> None:
     """Закрывает активную выдачу книги при изменении статуса"""
@@ -62,71 +121,216 @@ from sqlalchemy import select, func, distinct, case, exists
 from sqlalchemy.orm import selectinload
 
 
+def build_book_filters(
+    min_page_count: int | None,
+    max_page_count: int | None,
+    author_ids: List[int] | None,
+    genre_ids: List[int] | None,
+) -> list:
+    """Формирует условия фильтрации книг по страницам, авторам и жанрам"""
+    conditions = []
+
+    if min_page_count:
+        conditions.append(Book.page_count >= min_page_count) # ty: ignore
+    if max_page_count:
+        conditions.append(Book.page_count <= max_page_count) # ty: ignore
+
+    if author_ids:
+        conditions.append(
+            exists().where(
+                AuthorBookLink.book_id == Book.id, # ty: ignore
+                AuthorBookLink.author_id.in_(author_ids), # ty: ignore
+            )
+        )
+
+    if genre_ids:
+        for genre_id in genre_ids:
+            conditions.append(
+                exists().where(
+                    GenreBookLink.book_id == Book.id, GenreBookLink.genre_id == genre_id # ty: ignore
+                )
+            )
+
+    return conditions
+
+
+async def semantic_candidates(session: AsyncSession, q: str, conditions: list) -> List[int]:
+    """Возвращает ближайшие по эмбеддингу книги (ANN top-K)"""
+    emb = await asyncio.to_thread(generate_search_embedding, q)
+    await apply_search_params(session, limit=SEARCH_CANDIDATES)
+    return list((await session.scalars(
+        select(Book.id)
+        .where(*conditions)
+        .where(Book.embedding.is_not(None)) # ty: ignore
+        .order_by(Book.embedding.cosine_distance(emb)) # ty: ignore
+        .limit(SEARCH_CANDIDATES)
+    )).all())
+
+
+async def keyword_candidates(session: AsyncSession, q: str, conditions: list) -> List[int]:
+    """Возвращает книги с совпадением в названии, упорядоченные по триграммной близости"""
+    return list((await session.scalars(
+        select(Book.id)
+        .where(*conditions)
+        .where(Book.title.ilike(f"%{q}%")) # ty: ignore
+        .order_by(func.similarity(Book.title, q).desc(), Book.id) # ty: ignore
+        .limit(SEARCH_CANDIDATES)
+    )).all())
+
+
+def reciprocal_rank_fusion(*rankings: List[int], k: int = SEARCH_RRF_K) -> List[int]:
+    """Объединяет ранжирования методом Reciprocal Rank Fusion"""
+    scores: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, book_id in enumerate(ranking, start=1):
+            scores[book_id] = scores.get(book_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda book_id: scores[book_id], reverse=True)
+
+
 @router.get(
     "/filter",
     response_model=BookFilteredList,
     summary="Поиск по книгам",
     description="Фильтрует и ищет книги",
 )
-def filter_books(
+async def filter_books(
     current_user: OptionalAuth,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     q: str | None = Query(None, max_length=50, description="Поиск"),
     min_page_count: int | None = Query(None, ge=0),
     max_page_count: int | None = Query(None, ge=0),
     author_ids: List[Annotated[int, Field(gt=0)]] | None = Query(None),
     genre_ids: List[Annotated[int, Field(gt=0)]] | None = Query(None),
+    cursor: str | None = Query(None, description="Курсор следующей страницы (вместо page)"),
     page: int = Query(1, gt=0),
     size: int = Query(20, gt=0, le=100),
+    include_total: bool = Query(True, description="Подсчитать общее количество книг"),
 ):
     """Выполняет поиск книги в системе"""
+    conditions = build_book_filters(min_page_count, max_page_count, author_ids, genre_ids)
     statement = select(Book).options(
         selectinload(Book.authors), selectinload(Book.genres), defer(Book.embedding) # ty: ignore
     )
 
-    if min_page_count:
-        statement = statement.where(Book.page_count >= min_page_count) # ty: ignore
-    if max_page_count:
-        statement = statement.where(Book.page_count <= max_page_count) # ty: ignore
-
-    if author_ids:
-        statement = statement.where(
-            exists().where(
-                AuthorBookLink.book_id == Book.id, # ty: ignore
-                AuthorBookLink.author_id.in_(author_ids), # ty: ignore
-            )
+    if q and current_user:
+        ranked_ids = reciprocal_rank_fusion(
+            await semantic_candidates(session, q, conditions),
+            await keyword_candidates(session, q, conditions),
         )
-
-    if genre_ids:
-        for genre_id in genre_ids:
-            statement = statement.where(
-                exists().where(
-                    GenreBookLink.book_id == Book.id, GenreBookLink.genre_id == genre_id # ty: ignore
-                )
+        # Курсор гибридного поиска — позиция в объединенном рейтинге
+        offset = decode_cursor(cursor, 1)[0] if cursor is not None else (page - 1) * size
+        if not isinstance(offset, int) or offset < 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
             )
+        page_ids = ranked_ids[offset:offset + size]
 
-    count_statement = select(func.count()).select_from(statement.subquery())
-    total = session.scalar(count_statement)
+        books = (await session.scalars(statement.where(Book.id.in_(page_ids)))).unique().all() # ty: ignore
+        books_by_id = {book.id: book for book in books}
+        results = [books_by_id[book_id] for book_id in page_ids if book_id in books_by_id]
+
+        return BookFilteredList(
+            books=results,
+            total=len(ranked_ids) if include_total else None,
+            next_cursor=encode_cursor(offset + size) if offset + size < len(ranked_ids) else None,
+        )
 
     if q:
-        if current_user:
-            emb = generate_search_embedding(q)
-            distance_col = Book.embedding.cosine_distance(emb) # ty: ignore
-            statement = statement.where(Book.embedding.is_not(None)) # ty: ignore
+        conditions.append(Book.title.ilike(f"%{q}%")) # ty: ignore
+    statement = statement.where(*conditions)
 
-            keyword_match = case((Book.title.ilike(f"%{q}%"), 0), else_=1) # ty: ignore
-            statement = statement.order_by(keyword_match, distance_col)
-        else:
-            statement = statement.where(Book.title.ilike(f"%{q}%")) # ty: ignore
-            statement = statement.order_by(Book.id) # ty: ignore
+    total, total_estimated = None, False
+    if include_total:
+        total, total_estimated = await count_rows(session, select(Book.id).where(*conditions))
+
+    statement = statement.order_by(Book.id) # ty: ignore
+    if cursor is not None:
+        last_id = decode_cursor(cursor, 1)[0]
+        if not is_cursor_id(last_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+        statement = statement.where(Book.id > last_id)
     else:
-        statement = statement.order_by(Book.id) # ty: ignore
+        statement = statement.offset((page - 1) * size)
+
+    results = (await session.scalars(statement.limit(size + 1))).unique().all()
+
+    next_cursor = None
+    if len(results) > size:
+        results = results[:size]
+        next_cursor = encode_cursor(results[-1].id)
+
+    return BookFilteredList(
+        books=results,
+        total=total,
+        total_estimated=total_estimated,
+        next_cursor=next_cursor,
+    )
+
+
+@router.get(
+    "/index",
+    summary="Состояние векторного индекса",
+    description="Возвращает размер, параметры и прогресс построения ANN-индекса эмбеддингов. Только для админов.",
+)
+def get_books_index_status(
+    current_user: RequireAdmin,
+    session: Session = Depends(get_session),
+):
+    """Возвращает состояние векторного индекса книг"""
+    return JSONResponse(content=get_vector_index_status(session))
 
-    offset = (page - 1) * size
-    statement = statement.offset(offset).limit(size)
-    results = session.scalars(statement).unique().all()
 
-    return BookFilteredList(books=results, total=total)
+@router.get(
+    "/embeddings",
+    summary="Состояние эмбеддингов",
+    description="Возвращает прогресс генерации эмбеддингов книг, состояние очереди и статистику кэша поисковых запросов. Только для админов.",
+)
+def get_books_embeddings_status(
+    current_user: RequireAdmin,
+    session: Session = Depends(get_session),
+):
+    """Возвращает статистику работы с эмбеддингами"""
+    return JSONResponse(
+        content={
+            "regeneration": get_regeneration_progress(),
+            "queue": get_embedding_queue_stats(session),
+            "search_cache": get_search_cache_stats(),
+        }
+    )
+
+
+@router.get(
+    "/embeddings/failed",
+    response_model=EmbeddingJobList,
+    summary="Неудачные задачи генерации эмбеддингов",
+    description="Возвращает задачи, исчерпавшие попытки генерации эмбеддинга. Только для админов.",
+)
+def get_failed_embeddings(
+    current_user: RequireAdmin,
+    session: Session = Depends(get_session),
+):
+    """Возвращает список неудачных задач генерации эмбеддингов"""
+    jobs = get_failed_embedding_jobs(session)
+    return EmbeddingJobList(jobs=[EmbeddingJobRead(**job) for job in jobs], total=len(jobs))
+
+
+@router.post(
+    "/embeddings/failed/retry",
+    summary="Повторить неудачные задачи генерации эмбеддингов",
+    description="Возвращает неудачные задачи в очередь. Только для админов.",
+)
+def retry_failed_embeddings(
+    current_user: RequireAdmin,
+    retry: EmbeddingJobRetry | None = None,
+    session: Session = Depends(get_session),
+):
+    """Возвращает неудачные задачи генерации эмбеддингов в очередь"""
+    count = retry_failed_embedding_jobs(session, retry.book_ids if retry else None)
+    return JSONResponse(content={"retried": count})
 
 
 @router.post(
@@ -141,91 +345,113 @@ def create_book(
     session: Session = Depends(get_session),
 ):
     """Создает новую книгу в системе"""
-    emb = generate_book_embedding(book.title, book.description)
-    db_book = Book(**book.model_dump(), embedding=emb)
+    db_book = Book(**book.model_dump())
 
     session.add(db_book)
+    session.flush()
+    enqueue_embedding_job(session, db_book.id)  # ty: ignore
     session.commit()
     session.refresh(db_book)
 
     book_dict = {k: v for k, v in db_book.__dict__.items() if not k.startswith('_')}
     book_data = {k: v for k, v in book_dict.items() if k not in {"embedding", "preview_id"}}
-    book_data["preview_urls"] = {
-        "png": f"/static/books/{db_book.preview_id}.png",
-        "jpeg": f"/static/books/{db_book.preview_id}.jpg",
-        "webp": f"/static/books/{db_book.preview_id}.webp",
-    } if db_book.preview_id else {}
+    book_data["preview_urls"] = get_preview_urls(db_book.preview_id)
     return BookRead(**book_data)
 
 
+@router.post(
+    "/bulk",
+    response_model=BookImportResult,
+    summary="Массовый импорт книг",
+    description="Импортирует книги из NDJSON или CSV (в формате выгрузки) пачками, авторы и жанры указываются по имени",
+)
+def bulk_import_books(
+    current_user: RequireStaff,
+    file: UploadFile = File(...),
+    format: ExportFormat | None = Query(None, description="Формат файла (по умолчанию по расширению)"),
+    session: Session = Depends(get_session),
+):
+    """Импортирует книги из файла"""
+    import_format = format or detect_import_format(file.filename)
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    return import_books(session, parse_import_rows(lines, import_format))
+
+
 @router.get(
     "/",
     response_model=BookList,
     summary="Получить список книг",
-    description="Возвращает список всех книг в системе",
+    description="Возвращает страницу книг по курсору after_id или все книги потоком NDJSON",
 )
-def read_books(session: Session = Depends(get_session)):
-    """Возвращает список всех книг"""
-    books = session.exec(select(Book)).all() # ty: ignore
-
-    books_data = []
-    for book in books:
-        book = book[0]
-        book_dict = dict(book)
-
-        book_data = {k: v for k, v in book_dict.items() if k not in {"embedding", "preview_id"}}
+async def read_books(
+    session: AsyncSession = Depends(get_async_session),
+    after_id: int = Query(0, ge=0, description="Вернуть книги с ID больше указанного"),
+    limit: int = Query(100, gt=0, le=1000, description="Размер страницы"),
+    stream: bool = Query(False, description="Вернуть все книги потоком NDJSON"),
+):
+    """Возвращает список книг постранично"""
+    statement = (
+        select(*BOOK_READ_COLUMNS)
+        .where(Book.id > after_id) # ty: ignore
+        .order_by(Book.id) # ty: ignore
+    )
 
-        book_data["preview_urls"] = {
-            "png": f"/static/books/{book.preview_id}.png",
-            "jpeg": f"/static/books/{book.preview_id}.jpg",
-            "webp": f"/static/books/{book.preview_id}.webp",
-        } if book.preview_id else {}
+    if stream:
+        return StreamingResponse(stream_books(statement), media_type="application/x-ndjson")
 
-        books_data.append(book_data)
+    rows = (await session.execute(statement.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
     return BookList(
-        books=[BookRead(**book_data) for book_data in books_data],
-        total=len(books),
+        books=[BookRead(**book_row_to_dict(row)) for row in rows],
+        total=len(rows),
+        next_after_id=rows[-1].id if has_more else None,
     )
 
 
+async def stream_books(statement) -> AsyncIterator[str]:
+    """Отдает книги построчно в формате NDJSON через серверный курсор"""
+    async with async_engine.connect() as connection:
+        result = await connection.stream(statement.execution_options(yield_per=BOOKS_STREAM_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield "".join(
+                json.dumps(book_row_to_dict(row), ensure_ascii=False) + "\n" for row in rows
+            )
+
+
 @router.get(
     "/{book_id}",
     response_model=BookWithAuthorsAndGenres,
     summary="Получить информацию о книге",
     description="Возвращает информацию о книге, её авторах и жанрах",
 )
-def get_book(
+async def get_book(
     book_id: int = Path(..., description="ID книги (целое число, > 0)", gt=0),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """Возвращает информацию о книге с авторами и жанрами"""
-    book = session.get(Book, book_id)
+    book = await session.get(Book, book_id, options=[defer(Book.embedding)]) # ty: ignore
     if not book:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Book not found",
         )
 
-    authors = session.scalars(
+    authors = (await session.scalars(
         select(Author).join(AuthorBookLink).where(AuthorBookLink.book_id == book_id) # ty: ignore
-    ).all()
+    )).all()
 
     author_reads = [AuthorRead(**author.model_dump()) for author in authors]
 
-    genres = session.scalars(
+    genres = (await session.scalars(
         select(Genre).join(GenreBookLink).where(GenreBookLink.book_id == book_id) # ty: ignore
-    ).all()
+    )).all()
 
     genre_reads = [GenreRead(**genre.model_dump()) for genre in genres]
 
-    book_dict = {k: v for k, v in book.__dict__.items() if not k.startswith('_')}
-    book_data = {k: v for k, v in book_dict.items() if k not in {"embedding", "preview_id"}}
-    book_data["preview_urls"] = {
-        "png": f"/static/books/{book.preview_id}.png",
-        "jpeg": f"/static/books/{book.preview_id}.jpg",
-        "webp": f"/static/books/{book.preview_id}.webp",
-    } if book.preview_id else {}
+    book_data = book.model_dump(exclude={"embedding", "preview_id"})
+    book_data["preview_urls"] = get_preview_urls(book.preview_id)
     book_data["authors"] = author_reads
     book_data["genres"] = genre_reads
 
@@ -270,10 +496,9 @@ def update_book(
         if book_update.description is not None:
             db_book.description = book_update.description
 
-        db_book.embedding = generate_book_embedding(
-            book_update.title or db_book.title,
-            book_update.description or db_book.description,
-        )
+        source_hash = embedding_source_hash(book_embedding_text(db_book.title, db_book.description))
+        if source_hash != db_book.embedding_source_hash:
+            enqueue_embedding_job(session, book_id)
 
     if book_update.page_count is not None:
         db_book.page_count = book_update.page_count
@@ -283,11 +508,7 @@ def update_book(
     session.refresh(db_book)
 
     book_data = db_book.model_dump(exclude={"embedding", "preview_id"})
-    book_data["preview_urls"] = {
-        "png": f"/static/books/{db_book.preview_id}.png",
-        "jpeg": f"/static/books/{db_book.preview_id}.jpg",
-        "webp": f"/static/books/{db_book.preview_id}.webp",
-    } if db_book.preview_id else {}
+    book_data["preview_urls"] = get_preview_urls(db_book.preview_id)
 
     return BookRead(**book_data)
 
@@ -298,13 +519,13 @@ def update_book(
     summary="Удалить книгу",
     description="Удаляет книгу их системы",
 )
-def delete_book(
+async def delete_book(
     current_user: RequireStaff,
     book_id: int = Path(..., description="ID книги (целое число, > 0)", gt=0),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """Удаляет книгу из системы"""
-    book = session.get(Book, book_id)
+    book = await session.get(Book, book_id)
     if not book:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -317,20 +538,22 @@ def delete_book(
         page_count=book.page_count,
         status=book.status,
     )
-    session.delete(book)
-    session.commit()
+    preview_id = book.preview_id
+    await session.delete(book)
+    await session.commit()
+    await release_cover(session, preview_id)
     return book_read
 
 @router.post(
     "/{book_id}/preview",
     summary="Утановить обложку книги",
-    description="Меняет обложку книги в системе",
+    description="Меняет обложку книги в системе. Если все обработчики заняты, возвращает 202 и адрес статуса обработки.",
 )
 async def upload_book_preview(
     current_user: RequireStaff,
     file: UploadFile = File(...),
     book_id: int = Path(..., gt=0),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session),
 ):
     """Загружает обложку книги в систему"""
     if not (file.content_type or "").startswith("image/"):
@@ -339,45 +562,122 @@ async def upload_book_preview(
             detail="Image required",
         )
 
-    if (file.size or 0) > 32 * 1024 * 1024:
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File larger than {COVER_MAX_SIZE // (1024 * 1024)} MB",
+    )
+    if (file.size or 0) > COVER_MAX_SIZE:
+        raise too_large
+
+    if not await session.get(Book, book_id):
         raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail="File larger than 10 MB",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Book not found",
         )
 
-    file_uuid= uuid4()
-    tmp_path = BOOKS_PREVIEW_DIR / f"{file_uuid}.upload"
+    try:
+        queued = cover_transcoder.reserve()
+    except CoverQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Cover processing queue is full",
+            headers={"Retry-After": "5"},
+        )
 
-    with open(tmp_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+    token = uuid4().hex
+    tmp_path = COVER_UPLOAD_DIR / f"{token}.upload"
+    hasher = cover_hasher()
+    try:
+        size = 0
+        async with aiofiles.open(tmp_path, "wb") as f:
+            while chunk := await file.read(COVER_UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > COVER_MAX_SIZE:
+                    raise too_large
+                hasher.update(chunk)
+                await f.write(chunk)
+        preview_id = hasher.hexdigest()
+
+        # Такая же обложка уже обработана: перекодирование не требуется
+        try:
+            preview_urls = await assign_cover(book_id, preview_id)
+        except CoverMissing:
+            if queued:
+                await start_cover_task(book_id, preview_id)
+            await asyncio.to_thread(stage_upload, tmp_path, preview_id, token)
+        else:
+            cover_transcoder.release()
+            await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+            if preview_urls is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Book not found",
+                )
+            return {"preview": preview_urls}
+    except BaseException:
+        if tmp_path.exists():  # файл еще не передан на обработку
+            cover_transcoder.release()
+            await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+        raise
+
+    if queued:
+        cover_transcoder.process_in_background(book_id, preview_id, token)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "status": CoverTaskStatus.PENDING,
+                "status_url": f"/api/books/{book_id}/preview/{preview_id}",
+            },
+        )
 
-    book = session.get(Book, book_id)
-    if not book:
-        tmp_path.unlink()
+    try:
+        preview_urls = await cover_transcoder.process(book_id, preview_id, token)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Cover processing failed",
+        )
+    if preview_urls is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Book not found",
         )
 
-    transcode_image(tmp_path)
-    tmp_path.unlink()
+    return {"preview": preview_urls}
 
-    if book.preview_id:
-        for path in BOOKS_PREVIEW_DIR.glob(f"{book.preview_id}.*"):
-            if path.exists():
-                path.unlink(missing_ok=True)
 
-    book.preview_id = file_uuid
-    session.add(book)
-    session.commit()
+@router.get(
+    "/{book_id}/preview/{preview_id}",
+    summary="Статус обработки обложки",
+    description="Возвращает состояние обработки загруженной обложки: 202 пока она в очереди, 200 после назначения книге",
+)
+async def get_book_preview_status(
+    current_user: RequireStaff,
+    book_id: int = Path(..., gt=0),
+    preview_id: str = Path(..., pattern="^[0-9a-f]{64}$", description="Хэш содержимого загруженной обложки"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Возвращает состояние обработки обложки книги"""
+    book = await session.get(Book, book_id)
+    task = await get_cover_task_status(session, book, preview_id) if book else None
+    if task is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Preview task not found",
+        )
 
-    return {
-            "preview": {
-                "png": f"/static/books/{file_uuid}.png",
-                "jpeg": f"/static/books/{file_uuid}.jpg",
-                "webp": f"/static/books/{file_uuid}.webp",
-            }
-        }
+    task_status, error = task
+    if task_status == CoverTaskStatus.FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Cover processing failed: {error}",
+        )
+    if task_status == CoverTaskStatus.PENDING:
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"status": task_status},
+        )
+    return {"status": task_status, "preview": get_preview_urls(preview_id)}
 
 
 @router.delete(
@@ -388,20 +688,17 @@ async def upload_book_preview(
 async def remove_book_preview(
     current_user: RequireStaff,
     book_id: int = Path(..., gt=0),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session),
 ):
     """Убирает обложку книги в системе"""
-    book = session.get(Book, book_id)
+    book = await session.get(Book, book_id)
     if not book:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Book not found")
 
-    if book.preview_id:
-        for path in BOOKS_PREVIEW_DIR.glob(f"{book.preview_id}.*"):
-            if path.exists():
-                path.unlink(missing_ok=True)
-
+    preview_id = book.preview_id
     book.preview_id = None
     session.add(book)
-    session.commit()
+    await session.commit()
+    await release_cover(session, preview_id)
 
     return {"preview_urls": []}
@@ -4,33 +4,42 @@ import secrets
 
 from fastapi import APIRouter, Request, Depends, HTTPException, status
 from fastapi.responses import JSONResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from library_service.models.db import CaptchaToken
 from library_service.services.captcha import (
     limiter,
     get_ip,
-    active_challenges,
-    challenges_by_ip,
+    count_challenges,
+    pop_token,
+    CHALLENGE_PARAMS,
     MAX_CHALLENGES_PER_IP,
     MAX_TOTAL_CHALLENGES,
     CHALLENGE_TTL,
     REDEEM_TTL,
     prng,
     now_ms,
-    redeem_tokens,
 )
+from library_service.settings import get_async_session
 
 router = APIRouter(prefix="/cap", tags=["captcha"])
 
 
 @router.post("/challenge", summary="Задача capjs")
 @limiter.limit("15/minute")
-async def challenge(request: Request, ip: str = Depends(get_ip)):
+async def challenge(
+    request: Request,
+    ip: str = Depends(get_ip),
+    session: AsyncSession = Depends(get_async_session),
+):
     """Возвращает задачу capjs"""
-    if challenges_by_ip[ip] >= MAX_CHALLENGES_PER_IP:
+    by_ip, total = await count_challenges(session, ip)
+    if by_ip >= MAX_CHALLENGES_PER_IP:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Too many challenges",
         )
-    if len(active_challenges) >= MAX_TOTAL_CHALLENGES:
+    if total >= MAX_TOTAL_CHALLENGES:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Server busy",
@@ -40,54 +49,50 @@ async def challenge(request: Request, ip: str = Depends(get_ip)):
     redeem = secrets.token_hex(25)
     expires = now_ms() + CHALLENGE_TTL
 
-    active_challenges[token] = {
-        "c": 50,
-        "s": 32,
-        "d": 4,
-        "expires": expires,
-        "redeem_token": redeem,
-        "ip": ip,
-    }
-    challenges_by_ip[ip] += 1
+    session.add(CaptchaToken(token=token, kind="challenge", ip=ip, redeem_token=redeem, expires=expires))
+    await session.commit()
 
-    return {"challenge": {"c": 50, "s": 32, "d": 4}, "token": token, "expires": expires}
+    return {"challenge": CHALLENGE_PARAMS, "token": token, "expires": expires}
 
 
 @router.post("/redeem", summary="Проверка задачи")
 @limiter.limit("30/minute")
-async def redeem(request: Request, payload: dict, ip: str = Depends(get_ip)):
+async def redeem(
+    request: Request,
+    payload: dict,
+    ip: str = Depends(get_ip),
+    session: AsyncSession = Depends(get_async_session),
+):
     """Возвращает capjs_token"""
     token = payload.get("token")
     solutions = payload.get("solutions", [])
 
-    if token not in active_challenges:
+    ch = await pop_token(session, token, "challenge") if isinstance(token, str) else None
+    if ch is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Invalid challenge",
         )
 
-    ch = active_challenges.pop(token)
-    challenges_by_ip[ch["ip"]] -= 1
-
-    if now_ms() > ch["expires"]:
+    if now_ms() > ch.expires:
         raise HTTPException(
             status_code=status.HTTP_410_GONE,
             detail="Expired"
         )
-    if len(solutions) < ch["c"]:
+    if len(solutions) < CHALLENGE_PARAMS["c"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Bad solutions",
         )
 
     def verify(i: int) -> bool:
-        salt = prng(f"{token}{i+1}", ch["s"])
-        target = prng(f"{token}{i+1}d", ch["d"])
+        salt = prng(f"{token}{i+1}", CHALLENGE_PARAMS["s"])
+        target = prng(f"{token}{i+1}d", CHALLENGE_PARAMS["d"])
         h = hashlib.sha256((salt + str(solutions[i])).encode()).hexdigest()
         return h.startswith(target)
 
     results = await asyncio.gather(
-        *(asyncio.to_thread(verify, i) for i in range(ch["c"]))
+        *(asyncio.to_thread(verify, i) for i in range(CHALLENGE_PARAMS["c"]))
     )
     if not all(results):
         raise HTTPException(
@@ -95,11 +100,13 @@ async def redeem(request: Request, payload: dict, ip: str = Depends(get_ip)):
             detail="Invalid solution",
         )
 
-    r_token = ch["redeem_token"]
-    redeem_tokens[r_token] = now_ms() + REDEEM_TTL
+    r_token = ch.redeem_token
+    r_expires = now_ms() + REDEEM_TTL
+    session.add(CaptchaToken(token=r_token, kind="redeem", expires=r_expires))
+    await session.commit()
 
     resp = JSONResponse(
-        {"success": True, "token": r_token, "expires": redeem_tokens[r_token]}
+        {"success": True, "token": r_token, "expires": r_expires}
     )
     resp.set_cookie(
         key="capjs_token",
@@ -0,0 +1,70 @@
+"""Модуль потоковой выгрузки каталога"""
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from library_service.middlewares import skip_compression
+from library_service.models.enums import ExportEntity, ExportFormat
+from library_service.services import (
+    EXPORT_MEDIA_TYPES,
+    encode_export,
+    get_export_last_modified,
+    gzip_stream,
+)
+from library_service.settings import get_async_session
+
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """Проверяет, принимает ли клиент ответ в gzip"""
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def not_modified_since(if_modified_since: str | None, last_modified) -> bool:
+    """Проверяет, не изменились ли данные с даты из заголовка If-Modified-Since"""
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return since.tzinfo is not None and last_modified <= since
+
+
+@router.get(
+    "/{entity}",
+    summary="Выгрузка каталога",
+    description="Потоково выгружает книги (с авторами и жанрами), авторов или жанров в NDJSON или CSV",
+)
+@skip_compression  # выгрузка сама сжимает поток в gzip с уровнем EXPORT_GZIP_LEVEL
+async def export_catalogue(
+    request: Request,
+    entity: ExportEntity,
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="Формат выгрузки"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Выгружает сущности каталога потоком"""
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    last_modified = await get_export_last_modified(session, entity)
+    if last_modified is not None:
+        last_modified = last_modified.replace(microsecond=0)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+        if not_modified_since(request.headers.get("if-modified-since"), last_modified):
+            return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = f'attachment; filename="{entity.value}.{format.value}"'
+    body = encode_export(entity, format)
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        body = gzip_stream(body)
+
+    return StreamingResponse(body, media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
@@ -1,7 +1,9 @@
 """Модуль работы с жанрами"""
 
 from fastapi import APIRouter, Depends, HTTPException, Path, status
+from sqlalchemy.orm import defer
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from library_service.auth import RequireStaff
 from library_service.models.db import Book, Genre, GenreBookLink
@@ -13,7 +15,7 @@ from library_service.models.dto import (
     GenreUpdate,
     GenreWithBooks,
 )
-from library_service.settings import get_session
+from library_service.settings import get_async_session, get_session
 
 
 router = APIRouter(prefix="/genres", tags=["genres"])
@@ -44,9 +46,9 @@ def create_genre(
     summary="Получить список жанров",
     description="Возвращает список всех жанров в системе",
 )
-def read_genres(session: Session = Depends(get_session)):
+async def read_genres(session: AsyncSession = Depends(get_async_session)):
     """Возвращает список всех жанров"""
-    genres = session.exec(select(Genre)).all()
+    genres = (await session.exec(select(Genre))).all()
     return GenreList(
         genres=[GenreRead(**genre.model_dump()) for genre in genres], total=len(genres)
     )
@@ -58,21 +60,22 @@ def read_genres(session: Session = Depends(get_session)):
     summary="Получить информацию о жанре",
     description="Возвращает информацию о жанре и книгах с ним",
 )
-def get_genre(
+async def get_genre(
     genre_id: int = Path(..., description="ID жанра (целое число, > 0)", gt=0),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """Возвращает информацию о жанре и книгах с ним"""
-    genre = session.get(Genre, genre_id)
+    genre = await session.get(Genre, genre_id)
     if not genre:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Genre not found",
         )
 
-    books = session.exec(
-        select(Book).join(GenreBookLink).where(GenreBookLink.genre_id == genre_id)
-    ).all()
+    books = (await session.exec(
+        select(Book).options(defer(Book.embedding))  # ty: ignore
+        .join(GenreBookLink).where(GenreBookLink.genre_id == genre_id)
+    )).all()
 
     book_reads = [BookRead(**book.model_dump()) for book in books]
 
@@ -6,17 +6,39 @@ from typing import Dict, List
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
 from fastapi.responses import JSONResponse
 from sqlmodel import Session, select, col, func
-from sqlalchemy import cast, Date
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import text, true, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 
 from library_service.auth import RequireAuth, RequireStaff, RequireAdmin, is_user_staff
-from library_service.settings import get_session
-from library_service.models.db import Book, User, BookUserLink
+from library_service.settings import get_async_session, get_session
+from library_service.models.db import Book, User, BookUserLink, LoanDailyStat
 from library_service.models.dto import LoanCreate, LoanRead, LoanList, LoanUpdate
 from library_service.models.enums import BookStatus
+from library_service.services import count_rows, decode_cursor, encode_cursor, is_cursor_id
 
 
 router = APIRouter(prefix="/loans", tags=["loans"])
 
+# Уникальный частичный индекс: не более одной активной выдачи книги
+ACTIVE_LOAN_CONSTRAINT = "uq_loans_active_book"
+
+
+def commit_new_loan(session: Session, db_loan: BookUserLink) -> None:
+    """Сохраняет новую выдачу, превращая конфликт активных выдач в 409"""
+    try:
+        session.commit()
+    except IntegrityError as e:
+        session.rollback()
+        if getattr(getattr(e.orig, "diag", None), "constraint_name", None) != ACTIVE_LOAN_CONSTRAINT:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Book already has an active loan",
+        )
+    session.refresh(db_loan)
+
 
 @router.post(
     "/",
@@ -69,8 +91,7 @@ def create_loan(
 
     session.add(db_loan)
     session.add(book)
-    session.commit()
-    session.refresh(db_loan)
+    commit_new_loan(session, db_loan)
 
     return LoanRead(**db_loan.model_dump())
 
@@ -81,16 +102,18 @@ def create_loan(
     summary="Получить список выдач",
     description="Возвращает список выдач. Читатели видят только свои. Сотрудники видят все.",
 )
-def read_loans(
+async def read_loans(
     current_user: RequireAuth,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     user_id: int | None = Query(None, description="Фильтр по user_ID"),
     book_id: int | None = Query(None, description="Фильтр по book_ID"),
     active_only: bool = Query(False, description="Только не возвращенные выдачи"),
+    cursor: str | None = Query(None, description="Курсор следующей страницы (вместо page)"),
     page: int = Query(1, gt=0, description="Номер страницы"),
     size: int = Query(20, gt=0, lt=101, description="Элементов на странице"),
+    include_total: bool = Query(True, description="Подсчитать общее количество выдач"),
 ):
-    """Возвращает список выдач с фильтрацией и пагинацией"""
+    """Возвращает список выдач с фильтрацией и курсорной пагинацией"""
     is_staff = is_user_staff(current_user)
 
     statement = select(BookUserLink)
@@ -106,17 +129,42 @@ def read_loans(
     if active_only:
         statement = statement.where(BookUserLink.returned_at == None)  # noqa: E711
 
-    total_statement = select(func.count()).select_from(statement.subquery())
-    total = session.exec(total_statement).one()
+    total, total_estimated = None, False
+    if include_total:
+        total, total_estimated = await count_rows(session, statement)
+
+    statement = statement.order_by(col(BookUserLink.borrowed_at).desc(), col(BookUserLink.id).desc())
+    if cursor is not None:
+        last_borrowed_at, last_id = decode_cursor(cursor, 2)
+        try:
+            last_borrowed_at = datetime.fromisoformat(last_borrowed_at)
+        except (TypeError, ValueError):
+            last_borrowed_at = None
+        # Курсоры выдаются с наивным временем UTC, как оно хранится в колонке
+        if last_borrowed_at is None or last_borrowed_at.tzinfo is not None or not is_cursor_id(last_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+        statement = statement.where(
+            BookUserLink.borrowed_at <= last_borrowed_at,
+            tuple_(BookUserLink.borrowed_at, BookUserLink.id) < tuple_(last_borrowed_at, last_id),
+        )
+    else:
+        statement = statement.offset((page - 1) * size)
 
-    offset = (page - 1) * size
-    statement = statement.order_by(col(BookUserLink.borrowed_at).desc())
-    statement = statement.offset(offset).limit(size)
+    loans = (await session.exec(statement.limit(size + 1))).all()
 
-    loans = session.exec(statement).all()
+    next_cursor = None
+    if len(loans) > size:
+        loans = loans[:size]
+        next_cursor = encode_cursor(loans[-1].borrowed_at.isoformat(), loans[-1].id)
 
     return LoanList(
-        loans=[LoanRead(**loan.model_dump()) for loan in loans], total=total
+        loans=[LoanRead(**loan.model_dump()) for loan in loans],
+        total=total,
+        total_estimated=total_estimated,
+        next_cursor=next_cursor,
     )
 
 
@@ -130,108 +178,99 @@ def get_loans_analytics(
     days: int = Query(30, ge=1, le=365, description="Количество дней для анализа"),
     session: Session = Depends(get_session),
 ):
-    """Возвращает аналитику по выдачам и возвратам книг"""
+    """Возвращает аналитику по выдачам и возвратам книг из дневной статистики"""
     end_date = datetime.now(timezone.utc)
     start_date = end_date - timedelta(days=days)
-    total_loans = session.exec(
-        select(func.count(BookUserLink.id)).where(
-            BookUserLink.borrowed_at >= start_date
-        )
-    ).one()
+    in_period = LoanDailyStat.day >= start_date.date()
 
-    active_loans = session.exec(
-        select(func.count(BookUserLink.id))
-        .where(BookUserLink.borrowed_at >= start_date)
-        .where(BookUserLink.returned_at == None)  # noqa: E711
-    ).one()
+    loan_counts = select(
+        func.coalesce(func.sum(LoanDailyStat.issued), 0).label("total_loans"),
+        func.coalesce(func.sum(LoanDailyStat.closed), 0).label("returned_loans"),
+    ).where(in_period).cte("loan_counts")
 
-    returned_loans = session.exec(
-        select(func.count(BookUserLink.id))
-        .where(BookUserLink.borrowed_at >= start_date)
-        .where(BookUserLink.returned_at != None)  # noqa: E711
-    ).one()
-
-    overdue_loans = session.exec(
-        select(func.count(BookUserLink.id))
-        .where(BookUserLink.returned_at == None)  # noqa: E711
+    overdue_count = (
+        select(func.count())
+        .where(col(BookUserLink.returned_at).is_(None))
         .where(BookUserLink.due_date < end_date)
-    ).one()
-
-    daily_loans = {}
-    daily_returns = {}
-
-    loans_by_date = session.exec(
-        select(
-            cast(BookUserLink.borrowed_at, Date).label("date"),
-            func.count(BookUserLink.id).label("count"),
-        )
-        .where(BookUserLink.borrowed_at >= start_date)
-        .group_by(cast(BookUserLink.borrowed_at, Date))
-        .order_by(cast(BookUserLink.borrowed_at, Date))
-    ).all()
+        .scalar_subquery()
+    )
 
-    returns_by_date = session.exec(
-        select(
-            cast(BookUserLink.returned_at, Date).label("date"),
-            func.count(BookUserLink.id).label("count"),
-        )
-        .where(
-            BookUserLink.returned_at >= start_date  # ty: ignore[unsupported-operator]
+    book_counts = select(
+        func.count().filter(Book.status == BookStatus.RESERVED).label("reserved_books"),
+        func.count().filter(Book.status == BookStatus.BORROWED).label("borrowed_books"),
+    ).cte("book_counts")
+
+    def daily_counts(column):
+        per_day = (
+            select(LoanDailyStat.day, func.sum(column).label("count"))
+            .where(in_period)
+            .group_by(LoanDailyStat.day)  # ty: ignore
+            .having(func.sum(column) > 0)
+            .subquery()
         )
-        .where(BookUserLink.returned_at != None)  # noqa: E711
-        .group_by(cast(BookUserLink.returned_at, Date))
-        .order_by(cast(BookUserLink.returned_at, Date))
-    ).all()
-
-    for row in loans_by_date:
-        date_str = str(row[0]) if isinstance(row, tuple) else str(row.date)
-        count = row[1] if isinstance(row, tuple) else row.count
-        daily_loans[date_str] = count
-
-    for row in returns_by_date:
-        date_str = str(row[0]) if isinstance(row, tuple) else str(row.date)
-        count = row[1] if isinstance(row, tuple) else row.count
-        daily_returns[date_str] = count
-
-    top_books = session.exec(
-        select(BookUserLink.book_id, func.count(BookUserLink.id).label("loan_count"))
-        .where(BookUserLink.borrowed_at >= start_date)
-        .group_by(BookUserLink.book_id)
-        .order_by(func.count(BookUserLink.id).desc())
+        return select(
+            func.coalesce(func.json_object_agg(per_day.c.day, per_day.c.count), text("'{}'::json"))
+        ).scalar_subquery()
+
+    top_loans = (
+        select(LoanDailyStat.book_id, func.sum(LoanDailyStat.issued).label("loan_count"))
+        .where(in_period)
+        .group_by(LoanDailyStat.book_id)  # ty: ignore
+        .having(func.sum(LoanDailyStat.issued) > 0)
+        .order_by(func.sum(LoanDailyStat.issued).desc(), LoanDailyStat.book_id)
         .limit(10)
-    ).all()
-
-    top_books_data = []
-    for row in top_books:
-        book_id = row[0] if isinstance(row, tuple) else row.book_id
-        loan_count = row[1] if isinstance(row, tuple) else row.loan_count
-        book = session.get(Book, book_id)
-        if book:
-            top_books_data.append(
-                {"book_id": book_id, "title": book.title, "loan_count": loan_count}
+        .subquery()
+    )
+    top_books = (
+        select(
+            func.coalesce(
+                func.json_agg(
+                    aggregate_order_by(
+                        func.json_build_object(
+                            "book_id", top_loans.c.book_id,
+                            "title", Book.title,
+                            "loan_count", top_loans.c.loan_count,
+                        ),
+                        top_loans.c.loan_count.desc(),
+                        top_loans.c.book_id,
+                    )
+                ),
+                text("'[]'::json"),
             )
+        )
+        .select_from(top_loans)
+        .join(Book, Book.id == top_loans.c.book_id)  # ty: ignore
+        .scalar_subquery()
+    )
 
-    reserved_count = session.exec(
-        select(func.count(Book.id)).where(Book.status == BookStatus.RESERVED)
-    ).one()
-
-    borrowed_count = session.exec(
-        select(func.count(Book.id)).where(Book.status == BookStatus.BORROWED)
+    row = session.exec(
+        select(
+            loan_counts.c.total_loans,
+            loan_counts.c.returned_loans,
+            overdue_count.label("overdue_loans"),
+            book_counts.c.reserved_books,
+            book_counts.c.borrowed_books,
+            daily_counts(LoanDailyStat.issued).label("daily_loans"),
+            daily_counts(LoanDailyStat.returned).label("daily_returns"),
+            daily_counts(LoanDailyStat.overdue).label("daily_overdue"),
+            top_books.label("top_books"),
+        ).select_from(loan_counts).join(book_counts, true())
     ).one()
 
     return JSONResponse(
         content={
             "summary": {
-                "total_loans": total_loans,
-                "active_loans": active_loans,
-                "returned_loans": returned_loans,
-                "overdue_loans": overdue_loans,
-                "reserved_books": reserved_count,
-                "borrowed_books": borrowed_count,
+                "total_loans": row.total_loans,
+                "active_loans": row.total_loans - row.returned_loans,
+                "returned_loans": row.returned_loans,
+                "overdue_loans": row.overdue_loans,
+                "reserved_books": row.reserved_books,
+                "borrowed_books": row.borrowed_books,
             },
-            "daily_loans": daily_loans,
-            "daily_returns": daily_returns,
-            "top_books": top_books_data,
+            "daily_loans": dict(sorted(row.daily_loans.items())),
+            "daily_returns": dict(sorted(row.daily_returns.items())),
+            "daily_overdue": dict(sorted(row.daily_overdue.items())),
+            "top_books": row.top_books,
             "period_days": days,
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
@@ -245,13 +284,13 @@ def get_loans_analytics(
     summary="Получить выдачу по ID",
     description="Возвращает выдачу по ID",
 )
-def get_loan(
+async def get_loan(
     current_user: RequireAuth,
     loan_id: int = Path(..., description="Loan ID (integer, > 0)", gt=0),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """Возвращает информацию о выдаче по ID"""
-    loan = session.get(BookUserLink, loan_id)
+    loan = await session.get(BookUserLink, loan_id)
 
     if not loan:
         raise HTTPException(
@@ -479,17 +518,17 @@ def delete_loan(
     summary="Получить активную выдачу книги",
     description="Возвращает активную выдачу для указанной книги",
 )
-def get_active_loan_for_book(
+async def get_active_loan_for_book(
     current_user: RequireStaff,
     book_id: int = Path(..., description="Book ID (integer, > 0)", gt=0),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """Возвращает активную выдачу для указанной книги"""
-    loan = session.exec(
+    loan = (await session.exec(
         select(BookUserLink)
         .where(BookUserLink.book_id == book_id)
         .where(BookUserLink.returned_at == None)  # noqa: E711
-    ).first()
+    )).first()
 
     if not loan:
         return None
@@ -540,7 +579,6 @@ def issue_book_directly(
 
     session.add(db_loan)
     session.add(book)
-    session.commit()
-    session.refresh(db_loan)
+    commit_new_loan(session, db_loan)
 
     return LoanRead(**db_loan.model_dump())
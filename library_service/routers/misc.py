@@ -1,62 +1,68 @@
 """Модуль прочих эндпоинтов и веб-страниц"""
-import os
 import sys
 
-from datetime import datetime
 from pathlib import Path
 from typing import Dict
 
 from fastapi import APIRouter, Request
 from fastapi.params import Depends
-from fastapi.responses import FileResponse, JSONResponse, RedirectResponse
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, Response
 from fastapi.templating import Jinja2Templates
 from sqlmodel import Session, select, func
 
-from library_service.settings import get_app, get_session
+from library_service.settings import AppInfo, get_app_info, get_session, STATIC_DIR
 from library_service.models.db import Author, Book, Genre, User
-from library_service.services import SchemaGenerator
+from library_service.services import SchemaGenerator, asset_url, get_preview_urls
 from library_service import models
 
 
 router = APIRouter(tags=["misc"])
 generator = SchemaGenerator(models.db, models.dto)
 templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
+templates.env.globals["asset"] = asset_url
 
 
-def get_info(app) -> Dict:
+def get_info(info: AppInfo) -> Dict:
     """Возвращает информацию о приложении"""
     return {
         "status": "ok",
         "app_info": {
-            "title": app.title,
-            "version": app.version,
-            "description": app.description.rsplit("|", 1)[0],
+            "title": info.title,
+            "version": info.version,
+            "description": info.description,
         },
-        "server_time": datetime.now().isoformat(),
-        "domain": os.getenv("DOMAIN", ""),
+        "domain": info.domain,
     }
 
 
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Проверяет, совпадает ли ETag из заголовка If-None-Match с текущим"""
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
 @router.get("/", include_in_schema=False)
-async def root(request: Request, app=Depends(lambda: get_app())):
+async def root(request: Request, app: AppInfo = Depends(get_app_info)):
     """Рендерит главную страницу"""
     return templates.TemplateResponse(request, "index.html", get_info(app) | {"request": request, "title": "LiB - Библиотека"})
 
 
 @router.get("/unknown", include_in_schema=False)
-async def unknown(request: Request, app=Depends(lambda: get_app())):
+async def unknown(request: Request, app: AppInfo = Depends(get_app_info)):
     """Рендерит страницу 404 ошибки"""
     return templates.TemplateResponse(request, "unknown.html", get_info(app) | {"request": request, "title": "LiB - Страница не найдена"})
 
 
 @router.get("/genre/create", include_in_schema=False)
-async def create_genre(request: Request, app=Depends(lambda: get_app())):
+async def create_genre(request: Request, app: AppInfo = Depends(get_app_info)):
     """Рендерит страницу создания жанра"""
     return templates.TemplateResponse(request, "create_genre.html", get_info(app) | {"request": request, "title": "LiB - Создать жанр"})
 
 
 @router.get("/genre/{genre_id}/edit", include_in_schema=False)
-async def edit_genre(request: Request, genre_id: str, app=Depends(lambda: get_app())):
+async def edit_genre(request: Request, genre_id: str, app: AppInfo = Depends(get_app_info)):
     """Рендерит страницу редактирования жанра"""
 
     try:
@@ -68,19 +74,19 @@ async def edit_genre(request: Request, genre_id: str, app=Depends(lambda: get_ap
 
 
 @router.get("/authors", include_in_schema=False)
-async def authors(request: Request, app=Depends(lambda: get_app())):
+async def authors(request: Request, app: AppInfo = Depends(get_app_info)):
     """Рендерит страницу списка авторов"""
     return templates.TemplateResponse(request, "authors.html", get_info(app) | {"request": request, "title": "LiB - Авторы"})
 
 
 @router.get("/author/create", include_in_schema=False)
-async def create_author(request: Request, app=Depends(lambda: get_app())):
+async def create_author(request: Request, app: AppInfo = Depends(get_app_info)):
     """Рендерит страницу создания автора"""
     return templates.TemplateResponse(request, "create_author.html", get_info(app) | {"request": request, "title": "LiB - Создать автора"})
 
 
 @router.get("/author/{author_id}/edit", include_in_schema=False)
-async def edit_author(request: Request, author_id: str, app=Depends(lambda: get_app()), session=Depends(get_session)):
+async def edit_author(request: Request, author_id: str, app: AppInfo = Depends(get_app_info), session=Depends(get_session)):
     """Рендерит страницу редактирования автора"""
 
     try:
@@ -93,7 +99,7 @@ async def edit_author(request: Request, author_id: str, app=Depends(lambda: get_
 
 
 @router.get("/author/{author_id}", include_in_schema=False)
-async def author(request: Request, author_id: str, app=Depends(lambda: get_app()), session=Depends(get_session)):
+async def author(request: Request, author_id: str, app: AppInfo = Depends(get_app_info), session=Depends(get_session)):
     """Рендерит страницу просмотра автора"""
 
     if author_id == "":
@@ -109,19 +115,19 @@ async def author(request: Request, author_id: str, app=Depends(lambda: get_app()
 
 
 @router.get("/books", include_in_schema=False)
-async def books(request: Request, app=Depends(lambda: get_app())):
+async def books(request: Request, app: AppInfo = Depends(get_app_info)):
     """Рендерит страницу списка книг"""
     return templates.TemplateResponse(request, "books.html", get_info(app) | {"request": request, "title": "LiB - Книги"})
 
 
 @router.get("/book/create", include_in_schema=False)
-async def create_book(request: Request, app=Depends(lambda: get_app())):
+async def create_book(request: Request, app: AppInfo = Depends(get_app_info)):
     """Рендерит страницу создания книги"""
     return templates.TemplateResponse(request, "create_book.html", get_info(app) | {"request": request, "title": "LiB - Создать книгу"})
 
 
 @router.get("/book/{book_id}/edit", include_in_schema=False)
-async def edit_book(request: Request, book_id: str, app=Depends(lambda: get_app()), session=Depends(get_session)):
+async def edit_book(request: Request, book_id: str, app: AppInfo = Depends(get_app_info), session=Depends(get_session)):
     """Рендерит страницу редактирования книги"""
 
     try:
@@ -134,7 +140,7 @@ async def edit_book(request: Request, book_id: str, app=Depends(lambda: get_app(
 
 
 @router.get("/book/{book_id}", include_in_schema=False)
-async def book(request: Request, book_id: str, app=Depends(lambda: get_app()), session=Depends(get_session)):
+async def book(request: Request, book_id: str, app: AppInfo = Depends(get_app_info), session=Depends(get_session)):
     """Рендерит страницу просмотра книги"""
 
     if book_id == "":
@@ -146,41 +152,41 @@ async def book(request: Request, book_id: str, app=Depends(lambda: get_app()), s
     except:
         return await unknown(request, app)
 
-    return templates.TemplateResponse(request, "book.html", get_info(app) | {"request": request, "title": f"LiB - Книга \"{book.title}\"", "id": book_id, "img": book.preview_id})
+    return templates.TemplateResponse(request, "book.html", get_info(app) | {"request": request, "title": f"LiB - Книга \"{book.title}\"", "id": book_id, "img": get_preview_urls(book.preview_id).get("jpeg")})
 
 
 @router.get("/auth", include_in_schema=False)
-async def auth(request: Request, app=Depends(lambda: get_app())):
+async def auth(request: Request, app: AppInfo = Depends(get_app_info)):
     """Рендерит страницу авторизации"""
     return templates.TemplateResponse(request, "auth.html", get_info(app) | {"request": request, "title": "LiB - Авторизация"})
 
 
 @router.get("/2fa", include_in_schema=False)
-async def set2fa(request: Request, app=Depends(lambda: get_app())):
+async def set2fa(request: Request, app: AppInfo = Depends(get_app_info)):
     """Рендерит страницу установки двухфакторной аутентификации"""
     return templates.TemplateResponse(request, "2fa.html", get_info(app) | {"request": request, "title": "LiB - Двухфакторная аутентификация"})
 
 
 @router.get("/profile", include_in_schema=False)
-async def profile(request: Request, app=Depends(lambda: get_app())):
+async def profile(request: Request, app: AppInfo = Depends(get_app_info)):
     """Рендерит страницу профиля пользователя"""
     return templates.TemplateResponse(request, "profile.html", get_info(app) | {"request": request, "title": "LiB - Профиль"})
 
 
 @router.get("/users", include_in_schema=False)
-async def users(request: Request, app=Depends(lambda: get_app())):
+async def users(request: Request, app: AppInfo = Depends(get_app_info)):
     """Рендерит страницу управления пользователями"""
     return templates.TemplateResponse(request, "users.html", get_info(app) | {"request": request, "title": "LiB - Пользователи"})
 
 
 @router.get("/my-books", include_in_schema=False)
-async def my_books(request: Request, app=Depends(lambda: get_app())):
+async def my_books(request: Request, app: AppInfo = Depends(get_app_info)):
     """Рендерит страницу моих книг пользователя"""
     return templates.TemplateResponse(request, "my_books.html", get_info(app) | {"request": request, "title": "LiB - Мои книги"})
 
 
 @router.get("/analytics", include_in_schema=False)
-async def analytics(request: Request, app=Depends(lambda: get_app())):
+async def analytics(request: Request, app: AppInfo = Depends(get_app_info)):
     """Рендерит страницу аналитики выдач"""
     return templates.TemplateResponse(request, "analytics.html", get_info(app) | {"request": request, "title": "LiB - Аналитика"})
 
@@ -195,12 +201,14 @@ def redirect_favicon():
 async def favicon():
     """Возвращает иконку сайта"""
     return FileResponse(
-        "library_service/static/favicon.svg", media_type="image/svg+xml"
+        STATIC_DIR / "favicon.svg",
+        media_type="image/svg+xml",
+        headers={"Cache-Control": "public, max-age=86400"},
     )
 
 
 @router.get("/api", include_in_schema=False)
-async def api(request: Request, app=Depends(lambda: get_app())):
+async def api(request: Request, app: AppInfo = Depends(get_app_info)):
     """Рендерит страницу с ссылками на документацию API"""
     return templates.TemplateResponse(request, "api.html", get_info(app))
 
@@ -210,9 +218,12 @@ async def api(request: Request, app=Depends(lambda: get_app())):
     summary="Информация о сервисе",
     description="Возвращает общую информацию о системе",
 )
-async def api_info(app=Depends(lambda: get_app())):
+async def api_info(request: Request, app: AppInfo = Depends(get_app_info)):
     """Возвращает информацию о сервисе"""
-    return JSONResponse(content=get_info(app))
+    headers = {"ETag": app.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), app.etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=get_info(app), headers=headers)
 
 
 @router.get(
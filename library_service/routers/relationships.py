@@ -3,11 +3,20 @@
 from typing import Dict, List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlalchemy import delete, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, select
 
 from library_service.auth import RequireStaff
 from library_service.models.db import Author, AuthorBookLink, Book, Genre, GenreBookLink
-from library_service.models.dto import AuthorRead, BookRead, GenreRead
+from library_service.models.dto import (
+    AuthorRead,
+    BookRead,
+    GenreRead,
+    RelationSet,
+    BookRelationsBatch,
+    RelationsUpdateResult,
+)
 from library_service.settings import get_session
 
 
@@ -25,6 +34,71 @@ def check_entity_exists(session, model, entity_id, entity_name):
     return entity
 
 
+def check_entities_exist(session, model, entity_ids, entity_name):
+    """Проверяет существование набора сущностей одним запросом"""
+    entity_ids = set(entity_ids)
+    if not entity_ids:
+        return
+    found = set(session.exec(select(model.id).where(col(model.id).in_(entity_ids))).all())
+    missing = sorted(entity_ids - found)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{entity_name} not found: {missing}",
+        )
+
+
+def replace_book_relationships(session, link_model, related_field, relations: Dict[int, List[int]]):
+    """Заменяет наборы связей книг: INSERT ... ON CONFLICT DO NOTHING и один разностный DELETE"""
+    related_column = getattr(link_model, related_field)
+    pairs = [
+        (book_id, related_id)
+        for book_id, related_ids in relations.items()
+        for related_id in dict.fromkeys(related_ids)
+    ]
+
+    added = 0
+    if pairs:
+        added = session.execute(
+            insert(link_model)
+            .values([{"book_id": book_id, related_field: related_id} for book_id, related_id in pairs])
+            .on_conflict_do_nothing()
+        ).rowcount
+
+    statement = delete(link_model).where(col(link_model.book_id).in_(relations.keys()))
+    if pairs:
+        statement = statement.where(tuple_(link_model.book_id, related_column).not_in(pairs))
+    removed = session.execute(statement).rowcount
+
+    return RelationsUpdateResult(added=added, removed=removed)
+
+
+def set_book_related(
+    session,
+    book_id,
+    related_ids,
+    related_model,
+    related_name,
+    link_model,
+    link_related_field,
+    read_model,
+):
+    """Устанавливает полный набор связанных с книгой сущностей и возвращает его"""
+    check_entity_exists(session, Book, book_id, "Book")
+    check_entities_exist(session, related_model, related_ids, related_name)
+
+    replace_book_relationships(session, link_model, link_related_field, {book_id: related_ids})
+    session.commit()
+
+    related = session.exec(
+        select(related_model)
+        .join(link_model)
+        .where(link_model.book_id == book_id)
+    ).all()
+
+    return [read_model(**obj.model_dump()) for obj in related]
+
+
 def add_relationship(session, link_model, id1, field1, id2, field2, detail):
     """Создает связь между сущностями в базе данных"""
     existing_link = session.exec(
@@ -260,3 +334,86 @@ def get_genres_for_book(book_id: int, session: Session = Depends(get_session)):
         "genre_id",
         GenreRead,
     )
+
+
+@router.put(
+    "/books/{book_id}/authors/",
+    response_model=List[AuthorRead],
+    summary="Заменить авторов книги",
+    description="Устанавливает полный набор авторов книги в одной транзакции",
+)
+def set_authors_for_book(
+    current_user: RequireStaff,
+    book_id: int,
+    relation: RelationSet,
+    session: Session = Depends(get_session),
+):
+    """Заменяет список авторов книги"""
+    return set_book_related(
+        session,
+        book_id,
+        relation.ids,
+        Author,
+        "Author",
+        AuthorBookLink,
+        "author_id",
+        AuthorRead,
+    )
+
+
+@router.put(
+    "/books/{book_id}/genres/",
+    response_model=List[GenreRead],
+    summary="Заменить жанры книги",
+    description="Устанавливает полный набор жанров книги в одной транзакции",
+)
+def set_genres_for_book(
+    current_user: RequireStaff,
+    book_id: int,
+    relation: RelationSet,
+    session: Session = Depends(get_session),
+):
+    """Заменяет список жанров книги"""
+    return set_book_related(
+        session,
+        book_id,
+        relation.ids,
+        Genre,
+        "Genre",
+        GenreBookLink,
+        "genre_id",
+        GenreRead,
+    )
+
+
+@router.put(
+    "/relationships/books",
+    response_model=RelationsUpdateResult,
+    summary="Заменить авторов и жанры нескольких книг",
+    description="Устанавливает наборы авторов и жанров для нескольких книг в одной транзакции",
+)
+def set_relationships_for_books(
+    current_user: RequireStaff,
+    batch: BookRelationsBatch,
+    session: Session = Depends(get_session),
+):
+    """Заменяет связи нескольких книг"""
+    authors = {item.book_id: item.author_ids for item in batch.books if item.author_ids is not None}
+    genres = {item.book_id: item.genre_ids for item in batch.books if item.genre_ids is not None}
+
+    check_entities_exist(session, Book, [item.book_id for item in batch.books], "Book")
+    check_entities_exist(session, Author, [i for ids in authors.values() for i in ids], "Author")
+    check_entities_exist(session, Genre, [i for ids in genres.values() for i in ids], "Genre")
+
+    result = RelationsUpdateResult(added=0, removed=0)
+    for link_model, related_field, relations in (
+        (AuthorBookLink, "author_id", authors),
+        (GenreBookLink, "genre_id", genres),
+    ):
+        if relations:
+            changes = replace_book_relationships(session, link_model, related_field, relations)
+            result.added += changes.added
+            result.removed += changes.removed
+    session.commit()
+
+    return result
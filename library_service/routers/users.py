@@ -18,6 +18,7 @@ from library_service.auth import (
     RequireAdmin,
     RequireStaff,
     get_password_hash,
+    invalidate_principal,
 )
 
 
@@ -34,8 +35,7 @@ def get_roles(
     session: Session = Depends(get_session),
 ):
     """Возвращает список ролей в системе"""
-    user_roles = [role.name for role in auth.roles]
-    exclude = {"payroll"} if "admin" not in user_roles else set()
+    exclude = {"payroll"} if "admin" not in auth.roles else set()
     roles = session.exec(select(Role)).all()
 
     return RoleList(
@@ -187,6 +187,7 @@ def update_user(
     session.add(user)
     session.commit()
     session.refresh(user)
+    invalidate_principal(user_id)
 
     return UserRead(**user.model_dump(), roles=[r.name for r in user.roles])
 
@@ -214,11 +215,13 @@ def delete_user(
         session.add(user)
         session.commit()
         session.refresh(user)
+        invalidate_principal(user_id)
         return UserRead(**user.model_dump(), roles=[r.name for r in user.roles])
     else:
         user_read = UserRead(**user.model_dump(), roles=[r.name for r in user.roles])
         session.delete(user)
         session.commit()
+        invalidate_principal(user_id)
         return user_read
 
 
@@ -258,6 +261,7 @@ def add_role_to_user(
     session.add(user)
     session.commit()
     session.refresh(user)
+    invalidate_principal(user_id)
 
     return UserRead(**user.model_dump(), roles=[r.name for r in user.roles])
 
@@ -298,5 +302,6 @@ def remove_role_from_user(
     session.add(user)
     session.commit()
     session.refresh(user)
+    invalidate_principal(user_id)
 
     return UserRead(**user.model_dump(), roles=[r.name for r in user.roles])
@@ -3,9 +3,8 @@ from .captcha import (
     cleanup_task,
     get_ip,
     require_captcha,
-    active_challenges,
-    redeem_tokens,
-    challenges_by_ip,
+    count_challenges,
+    pop_token,
     MAX_CHALLENGES_PER_IP,
     MAX_TOTAL_CHALLENGES,
     CHALLENGE_TTL,
@@ -13,12 +12,58 @@ from .captcha import (
     prng,
 )
 from .describe_er import SchemaGenerator
-from .image_processing import transcode_image
+from .image_processing import transcode_image, get_preview_urls, cover_hasher
+from .cover_processing import (
+    CoverMissing,
+    CoverQueueFull,
+    assign_cover,
+    backfill_renditions,
+    cover_exists,
+    cover_transcoder,
+    get_cover_task_status,
+    migrate_flat_covers,
+    publish_local_covers,
+    release_cover,
+    stage_upload,
+    start_cover_task,
+)
 from .embeddings import (
     get_ollama_client,
     generate_embedding,
     generate_book_embedding,
     generate_search_embedding,
+    book_embedding_text,
+    embedding_source_hash,
+    get_search_cache_stats,
+    get_regeneration_progress,
+)
+from .embedding_queue import (
+    enqueue_embedding_job,
+    enqueue_embedding_jobs,
+    embedding_worker,
+    get_embedding_queue_stats,
+    get_failed_embedding_jobs,
+    retry_failed_embedding_jobs,
+)
+from .catalogue_export import (
+    EXPORT_MEDIA_TYPES,
+    encode_export,
+    get_export_last_modified,
+    gzip_stream,
+)
+from .catalogue_import import (
+    detect_import_format,
+    parse_import_rows,
+    import_books,
+)
+from .pagination import encode_cursor, decode_cursor, is_cursor_id, estimate_rows, count_rows
+from .loan_stats import snapshot_overdue_loans, loan_stats_worker
+from .static_assets import asset_url, build_static_assets
+from .vector_index import (
+    VECTOR_INDEX_NAME,
+    apply_search_params,
+    ensure_vector_index,
+    get_vector_index_status,
 )
 
 __all__ = [
@@ -26,9 +71,8 @@ __all__ = [
     "cleanup_task",
     "get_ip",
     "require_captcha",
-    "active_challenges",
-    "redeem_tokens",
-    "challenges_by_ip",
+    "count_challenges",
+    "pop_token",
     "MAX_CHALLENGES_PER_IP",
     "MAX_TOTAL_CHALLENGES",
     "CHALLENGE_TTL",
@@ -36,8 +80,52 @@ __all__ = [
     "prng",
     "SchemaGenerator",
     "transcode_image",
+    "get_preview_urls",
+    "cover_hasher",
+    "CoverMissing",
+    "CoverQueueFull",
+    "assign_cover",
+    "backfill_renditions",
+    "cover_exists",
+    "cover_transcoder",
+    "get_cover_task_status",
+    "migrate_flat_covers",
+    "publish_local_covers",
+    "release_cover",
+    "stage_upload",
+    "start_cover_task",
     "get_ollama_client",
     "generate_embedding",
     "generate_book_embedding",
     "generate_search_embedding",
+    "book_embedding_text",
+    "embedding_source_hash",
+    "get_search_cache_stats",
+    "get_regeneration_progress",
+    "enqueue_embedding_job",
+    "enqueue_embedding_jobs",
+    "embedding_worker",
+    "get_embedding_queue_stats",
+    "get_failed_embedding_jobs",
+    "retry_failed_embedding_jobs",
+    "EXPORT_MEDIA_TYPES",
+    "encode_export",
+    "get_export_last_modified",
+    "gzip_stream",
+    "detect_import_format",
+    "parse_import_rows",
+    "import_books",
+    "encode_cursor",
+    "decode_cursor",
+    "is_cursor_id",
+    "estimate_rows",
+    "count_rows",
+    "snapshot_overdue_loans",
+    "loan_stats_worker",
+    "asset_url",
+    "build_static_assets",
+    "VECTOR_INDEX_NAME",
+    "apply_search_params",
+    "ensure_vector_index",
+    "get_vector_index_status",
 ]
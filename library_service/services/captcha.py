@@ -5,23 +5,29 @@ import asyncio
 import hashlib
 import secrets
 import time
-from collections import defaultdict
 
 from fastapi import Request, HTTPException, Depends, status
 from fastapi.responses import JSONResponse
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from sqlalchemy import delete
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from library_service.models.db import CaptchaToken
+from library_service.settings import async_engine, get_async_session, get_logger
 
 CLEANUP_INTERVAL = int(os.getenv("CAP_CLEANUP_INTERVAL", "10"))
 REDEEM_TTL = int(os.getenv("CAP_REDEEM_TTL_SECONDS", "180")) * 1000
 CHALLENGE_TTL = int(os.getenv("CAP_CHALLENGE_TTL_SECONDS", "120")) * 1000
 MAX_CHALLENGES_PER_IP = int(os.getenv("CAP_MAX_CHALLENGES_PER_IP", "12"))
 MAX_TOTAL_CHALLENGES = int(os.getenv("CAP_MAX_TOTAL_CHALLENGES", "1000"))
+CHALLENGE_PARAMS = {"c": 50, "s": 32, "d": 4}
 
-active_challenges: dict[str, dict] = {}
-redeem_tokens: dict[str, int] = {}
-challenges_by_ip: defaultdict[str, int] = defaultdict(int)
+# Задачи и токены хранятся в БД, чтобы их видели все воркеры.
+# Ограничения частоты запросов считаются в памяти каждого воркера.
 limiter = Limiter(key_func=get_remote_address)
+logger = get_logger()
 
 
 def now_ms() -> int:
@@ -53,26 +59,49 @@ def prng(seed: str, length: int) -> str:
 
 async def cleanup_task():
     while True:
-        now = now_ms()
-        for token, data in list(active_challenges.items()):
-            if data["expires"] < now:
-                challenges_by_ip[data["ip"]] -= 1
-                del active_challenges[token]
-        for token, exp in list(redeem_tokens.items()):
-            if exp < now:
-                del redeem_tokens[token]
+        try:
+            async with AsyncSession(async_engine) as session:
+                await session.exec(delete(CaptchaToken).where(CaptchaToken.expires < now_ms()))  # ty: ignore
+                await session.commit()
+        except Exception:
+            logger.exception("[-] CAPTCHA token cleanup failed")
         await asyncio.sleep(CLEANUP_INTERVAL)
 
 
+async def count_challenges(session: AsyncSession, ip: str) -> tuple[int, int]:
+    """Возвращает количество активных задач для IP и всего"""
+    by_ip, total = (await session.exec(
+        select(
+            func.count().filter(CaptchaToken.ip == ip),
+            func.count(),
+        )
+        .where(CaptchaToken.kind == "challenge")
+        .where(CaptchaToken.expires >= now_ms())
+    )).one()
+    return by_ip, total
+
+
+async def pop_token(session: AsyncSession, token: str, kind: str) -> CaptchaToken | None:
+    """Атомарно извлекает токен (повторное использование невозможно)"""
+    row = (await session.exec(
+        delete(CaptchaToken)  # ty: ignore
+        .where(CaptchaToken.token == token)
+        .where(CaptchaToken.kind == kind)
+        .returning(CaptchaToken)
+    )).scalar_one_or_none()
+    await session.commit()
+    return row
+
+
 def get_ip(request: Request) -> str:
     return get_remote_address(request)
 
 
-async def require_captcha(request: Request):
+async def require_captcha(request: Request, session: AsyncSession = Depends(get_async_session)):
     token = request.cookies.get("capjs_token")
-    if not token or token not in redeem_tokens or redeem_tokens[token] < now_ms():
+    redeem = await pop_token(session, token, "redeem") if token else None
+    if redeem is None or redeem.expires < now_ms():
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail={"error": "captcha_required"},
         )
-    del redeem_tokens[token]
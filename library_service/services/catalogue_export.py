@@ -0,0 +1,117 @@
+"""Модуль потоковой выгрузки каталога"""
+import csv, io, json, zlib
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Sequence
+
+from sqlalchemy import JSON, func, select, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from library_service.models.db import Author, AuthorBookLink, Book, CatalogueChange, Genre, GenreBookLink
+from library_service.models.enums import ExportEntity, ExportFormat
+from library_service.settings import async_engine, EXPORT_BATCH_SIZE, EXPORT_GZIP_LEVEL
+from .image_processing import get_preview_urls
+
+
+# Таблицы, изменения которых влияют на выгрузку сущности
+EXPORT_SOURCE_TABLES: Dict[ExportEntity, Sequence[str]] = {
+    ExportEntity.BOOKS: ("book", "author", "genre", "authorbooklink", "genrebooklink"),
+    ExportEntity.AUTHORS: ("author",),
+    ExportEntity.GENRES: ("genre",),
+}
+
+# Колонки CSV-выгрузки (URL обложек есть только в NDJSON)
+CSV_COLUMNS: Dict[ExportEntity, List[str]] = {
+    ExportEntity.BOOKS: ["id", "title", "description", "page_count", "status", "authors", "genres"],
+    ExportEntity.AUTHORS: ["id", "name"],
+    ExportEntity.GENRES: ["id", "name"],
+}
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+def _related_names(model, link_model, link_column):
+    """Коррелированный подзапрос со списком связанных сущностей книги в JSON"""
+    item = func.json_build_object("id", model.id, "name", model.name)
+    return (
+        select(func.coalesce(func.json_agg(aggregate_order_by(item, model.id)), text("'[]'::json")))
+        .join(link_model, getattr(link_model, link_column) == model.id)
+        .where(link_model.book_id == Book.id)
+        .scalar_subquery()
+        .cast(JSON)
+    )
+
+
+def build_export_statement(entity: ExportEntity):
+    """Возвращает запрос выгрузки сущности, упорядоченный по ID"""
+    if entity == ExportEntity.BOOKS:
+        return select(
+            Book.id, Book.title, Book.description, Book.page_count, Book.status, Book.preview_id,
+            _related_names(Author, AuthorBookLink, "author_id").label("authors"),
+            _related_names(Genre, GenreBookLink, "genre_id").label("genres"),
+        ).order_by(Book.id)  # ty: ignore
+    model = Author if entity == ExportEntity.AUTHORS else Genre
+    return select(model.id, model.name).order_by(model.id)  # ty: ignore
+
+
+async def get_export_last_modified(session: AsyncSession, entity: ExportEntity) -> datetime | None:
+    """Возвращает время последнего изменения данных выгрузки"""
+    statement = select(func.max(CatalogueChange.changed_at)).where(
+        CatalogueChange.entity.in_(EXPORT_SOURCE_TABLES[entity])  # ty: ignore
+    )
+    return (await session.execute(statement)).scalar()
+
+
+async def iter_export_batches(entity: ExportEntity) -> AsyncIterator[List[dict]]:
+    """Читает строки выгрузки пачками через серверный курсор"""
+    statement = build_export_statement(entity).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    async with async_engine.connect() as connection:
+        result = await connection.stream(statement)
+        async for rows in result.mappings().partitions():
+            batch = [dict(row) for row in rows]
+            if entity == ExportEntity.BOOKS:
+                for row in batch:
+                    row["preview_urls"] = get_preview_urls(row.pop("preview_id"))
+                    row["authors"] = row.pop("authors")
+                    row["genres"] = row.pop("genres")
+            yield batch
+
+
+def _csv_value(value):
+    """Приводит значение к ячейке CSV (списки связей — имена через точку с запятой)"""
+    if isinstance(value, list):
+        return "; ".join(item["name"] for item in value)
+    return value
+
+
+async def encode_export(entity: ExportEntity, export_format: ExportFormat) -> AsyncIterator[bytes]:
+    """Кодирует выгрузку в NDJSON или CSV, не накапливая её в памяти"""
+    if export_format == ExportFormat.NDJSON:
+        async for batch in iter_export_batches(entity):
+            yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in batch).encode()
+        return
+
+    columns = CSV_COLUMNS[entity]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for batch in iter_export_batches(entity):
+        writer.writerows([_csv_value(row[column]) for column in columns] for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = EXPORT_GZIP_LEVEL) -> AsyncIterator[bytes]:
+    """Сжимает поток в gzip по мере генерации"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
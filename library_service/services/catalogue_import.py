@@ -0,0 +1,145 @@
+"""Модуль массового импорта книг"""
+import csv, json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from library_service.models.db import Author, AuthorBookLink, Book, Genre, GenreBookLink
+from library_service.models.dto import BookImport, BookImportError, BookImportResult
+from library_service.models.enums import ExportFormat
+from library_service.settings import get_logger, IMPORT_BATCH_SIZE, IMPORT_MAX_ERRORS
+from .embedding_queue import enqueue_embedding_jobs
+
+
+logger = get_logger()
+
+# (номер строки, книга или None, ошибка или None)
+ImportRow = Tuple[int, BookImport | None, str | None]
+
+
+def detect_import_format(filename: str | None) -> ExportFormat:
+    """Определяет формат файла импорта по расширению (по умолчанию NDJSON)"""
+    if filename and Path(filename).suffix.lower() == ".csv":
+        return ExportFormat.CSV
+    return ExportFormat.NDJSON
+
+
+def _validate(line: int, data) -> ImportRow:
+    """Проверяет строку импорта"""
+    try:
+        return line, BookImport.model_validate(data), None
+    except ValidationError as e:
+        return line, None, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+
+def parse_import_rows(lines: Iterable[str], import_format: ExportFormat) -> Iterator[ImportRow]:
+    """Разбирает строки NDJSON или CSV (в формате выгрузки каталога) в книги"""
+    if import_format == ExportFormat.CSV:
+        reader = csv.DictReader(lines)
+        for data in reader:
+            yield _validate(reader.line_num, data)
+        return
+
+    for line, raw in enumerate(lines, start=1):
+        if not raw.strip():
+            continue
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError as e:
+            yield line, None, f"Invalid JSON: {e.msg}"
+            continue
+        yield _validate(line, data)
+
+
+def _resolve_names(session: Session, model, names: List[str], ids: Dict[str, int]) -> int:
+    """Находит или создает авторов/жанры по имени, возвращает количество созданных"""
+    missing = [name for name in dict.fromkeys(names) if name not in ids]
+    if not missing:
+        return 0
+
+    existing = session.exec(
+        select(model.id, model.name).where(model.name.in_(missing)).order_by(model.id)  # ty: ignore
+    ).all()
+    for model_id, name in existing:
+        ids.setdefault(name, model_id)
+
+    new = [name for name in missing if name not in ids]
+    if new:
+        created = session.execute(
+            insert(model).returning(model.id, model.name, sort_by_parameter_order=True),
+            [{"name": name} for name in new],
+        ).all()
+        for model_id, name in created:
+            ids[name] = model_id
+    return len(new)
+
+
+def _import_batch(
+    session: Session,
+    batch: List[BookImport],
+    author_ids: Dict[str, int],
+    genre_ids: Dict[str, int],
+    result: BookImportResult,
+) -> None:
+    """Вставляет пачку книг, их связи и задачи эмбеддингов в одной транзакции"""
+    result.authors_created += _resolve_names(session, Author, [n for b in batch for n in b.authors], author_ids)
+    result.genres_created += _resolve_names(session, Genre, [n for b in batch for n in b.genres], genre_ids)
+
+    book_ids = session.scalars(
+        insert(Book).returning(Book.id, sort_by_parameter_order=True),  # ty: ignore
+        [book.model_dump(mode="json", exclude={"authors", "genres"}) for book in batch],
+    ).all()
+
+    author_links = [
+        {"author_id": author_ids[name], "book_id": book_id}
+        for book, book_id in zip(batch, book_ids) for name in book.authors
+    ]
+    genre_links = [
+        {"genre_id": genre_ids[name], "book_id": book_id}
+        for book, book_id in zip(batch, book_ids) for name in book.genres
+    ]
+    if author_links:
+        session.execute(insert(AuthorBookLink), author_links)
+    if genre_links:
+        session.execute(insert(GenreBookLink), genre_links)
+
+    enqueue_embedding_jobs(session, list(book_ids))
+    session.commit()
+    result.imported += len(book_ids)
+
+
+def import_books(
+    session: Session,
+    rows: Iterable[ImportRow],
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> BookImportResult:
+    """Импортирует книги пачками: авторы и жанры по имени, эмбеддинги через очередь"""
+    result = BookImportResult(imported=0, skipped=0, authors_created=0, genres_created=0)
+    author_ids: Dict[str, int] = {}
+    genre_ids: Dict[str, int] = {}
+    batch: List[BookImport] = []
+
+    for line, book, error in rows:
+        if book is None:
+            result.skipped += 1
+            if len(result.errors) < IMPORT_MAX_ERRORS:
+                result.errors.append(BookImportError(line=line, error=error or "Invalid row"))
+            continue
+
+        batch.append(book)
+        if len(batch) >= batch_size:
+            _import_batch(session, batch, author_ids, genre_ids, result)
+            logger.info(f"[+] Imported {result.imported} books")
+            batch = []
+
+    if batch:
+        _import_batch(session, batch, author_ids, genre_ids, result)
+
+    logger.info(
+        f"[+] Import finished: {result.imported} books, {result.skipped} skipped, "
+        f"{result.authors_created} authors and {result.genres_created} genres created"
+    )
+    return result
@@ -0,0 +1,312 @@
+"""Модуль фоновой обработки обложек книг в пуле процессов"""
+import asyncio, multiprocessing, os, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+from pathlib import Path
+
+from sqlalchemy import DateTime, delete, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from library_service.models.db import Book, CoverTask
+from library_service.models.enums import CoverTaskStatus
+from library_service.settings import (
+    async_engine,
+    get_logger,
+    BOOKS_PREVIEW_DIR,
+    COVER_UPLOAD_DIR,
+    COVER_WORKERS,
+    COVER_QUEUE_SIZE,
+    COVER_TASK_TTL,
+    COVER_TASK_CLEANUP_INTERVAL,
+)
+from .image_processing import (
+    transcode_image,
+    get_preview_urls,
+    generate_renditions,
+    has_preview_files,
+    preview_path,
+    PREVIEW_FORMATS,
+)
+from .cover_storage import cover_storage
+
+
+logger = get_logger()
+
+
+class CoverQueueFull(Exception):
+    """Очередь обработки обложек переполнена"""
+
+
+class CoverMissing(Exception):
+    """Файлы обложки отсутствуют в хранилище"""
+
+
+def upload_path(preview_id: str, token: str) -> Path:
+    """Путь к исходному файлу загрузки, ожидающей обработки"""
+    return COVER_UPLOAD_DIR / f"{preview_id}.{token}.upload"
+
+
+async def cover_exists(preview_id: str) -> bool:
+    """Проверяет, что обложка с таким содержимым уже обработана"""
+    return await asyncio.to_thread(cover_storage.exists, preview_id)
+
+
+def stage_upload(tmp_path: Path, preview_id: str, token: str) -> None:
+    """Переименовывает загруженный файл по хэшу содержимого, передавая его на обработку"""
+    os.replace(tmp_path, upload_path(preview_id, token))
+
+
+async def lock_cover(session: AsyncSession, preview_id: str) -> None:
+    """Блокирует обложку до конца транзакции, чтобы подсчет ссылок, удаление файлов и назначение книге не пересекались"""
+    await session.exec(select(func.pg_advisory_xact_lock(func.hashtext(preview_id))))
+
+
+async def release_cover(session: AsyncSession, preview_id: str | None) -> None:
+    """Удаляет файлы обложки, если на нее больше не ссылается ни одна книга"""
+    if not preview_id:
+        return
+    await lock_cover(session, preview_id)
+    references = await session.scalar(select(func.count()).where(Book.preview_id == preview_id))
+    if not references:
+        await asyncio.to_thread(cover_storage.delete, preview_id)
+    await session.commit()
+
+
+async def assign_cover(book_id: int, preview_id: str, publish: bool = False) -> dict[str, str] | None:
+    """Назначает книге обработанную обложку и освобождает предыдущую
+
+    При publish=True сначала публикует перекодированные файлы в хранилище.
+    Вызывает CoverMissing, если файлов обложки нет (например, их только что удалили).
+    """
+    async with AsyncSession(async_engine) as session:
+        await lock_cover(session, preview_id)
+        if publish:
+            await asyncio.to_thread(cover_storage.publish, preview_id)
+        if not await cover_exists(preview_id):
+            raise CoverMissing()
+        book = await session.get(Book, book_id)
+        if book is None:
+            await release_cover(session, preview_id)
+            return None
+        old_preview_id = book.preview_id
+        book.preview_id = preview_id
+        session.add(book)
+        await session.commit()
+        if old_preview_id != preview_id:
+            await release_cover(session, old_preview_id)
+    return get_preview_urls(preview_id)
+
+
+def utc_now():
+    """Текущее время UTC по часам базы данных"""
+    return func.timezone("UTC", func.now(), type_=DateTime)
+
+
+async def start_cover_task(book_id: int, preview_id: str) -> None:
+    """Отмечает обработку обложки как ожидающую (состояние видно всем репликам)"""
+    statement = insert(CoverTask).values(
+        book_id=book_id,
+        preview_id=preview_id,
+        status=CoverTaskStatus.PENDING.value,
+        updated_at=utc_now(),
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["book_id", "preview_id"],
+        set_={"status": CoverTaskStatus.PENDING.value, "error": None, "updated_at": utc_now()},
+    )
+    async with AsyncSession(async_engine) as session:
+        await session.exec(statement)  # ty: ignore
+        await session.commit()
+
+
+async def finish_cover_task(book_id: int, preview_id: str, error: str | None = None) -> None:
+    """Удаляет задачу после успешной обработки или сохраняет ее ошибку"""
+    condition = (CoverTask.book_id == book_id) & (CoverTask.preview_id == preview_id)
+    if error is None:
+        statement = delete(CoverTask).where(condition)
+    else:
+        statement = update(CoverTask).where(condition).values(
+            status=CoverTaskStatus.FAILED.value, error=error, updated_at=utc_now()
+        )
+    async with AsyncSession(async_engine) as session:
+        await session.exec(statement)  # ty: ignore
+        await session.commit()
+
+
+class CoverTranscoder:
+    """Пул процессов перекодирования обложек с ограниченной очередью"""
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.in_flight = 0
+        self._executor: ProcessPoolExecutor | None = None
+        self._background: set[asyncio.Task] = set()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Пул процессов (создается при первой загрузке, процессы запускаются через spawn)"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def reserve(self) -> bool:
+        """Занимает место в пуле, возвращает True, если задаче придется ждать в очереди"""
+        if self.in_flight >= self.workers + self.queue_size:
+            raise CoverQueueFull()
+        self.in_flight += 1
+        return self.in_flight > self.workers
+
+    def release(self) -> None:
+        """Освобождает место в очереди, если обработка не была запущена"""
+        self.in_flight -= 1
+
+    async def process(
+        self, book_id: int, preview_id: str, token: str, track_task: bool = False
+    ) -> dict[str, str] | None:
+        """Перекодирует загруженную обложку и назначает ее книге"""
+        source = upload_path(preview_id, token)
+        try:
+            try:
+                preview_urls = await assign_cover(book_id, preview_id)
+            except CoverMissing:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(
+                    self.executor, transcode_image, source, BOOKS_PREVIEW_DIR / preview_path(preview_id)
+                )
+                preview_urls = await assign_cover(book_id, preview_id, publish=True)
+        except Exception as e:
+            logger.error(f"[-] Cover processing for book {book_id} failed: {e}")
+            if track_task:
+                await finish_cover_task(book_id, preview_id, str(e) or type(e).__name__)
+            raise
+        finally:
+            source.unlink(missing_ok=True)
+            self.release()
+        if track_task:
+            await finish_cover_task(book_id, preview_id)
+        return preview_urls
+
+    def process_in_background(self, book_id: int, preview_id: str, token: str) -> None:
+        """Ставит обработку обложки в фон"""
+        task = asyncio.create_task(self.process(book_id, preview_id, token, track_task=True))
+        self._background.add(task)
+        task.add_done_callback(self._finish_background)
+
+    def _finish_background(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled():
+            task.exception()  # ошибка уже записана в журнал и задачу
+
+    def shutdown(self) -> None:
+        """Останавливает пул процессов"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+cover_transcoder = CoverTranscoder(COVER_WORKERS, COVER_QUEUE_SIZE)
+
+
+async def get_cover_task_status(
+    session: AsyncSession, book: Book, preview_id: str
+) -> tuple[CoverTaskStatus, str | None] | None:
+    """Определяет состояние обработки обложки по задаче и книге (одинаково на всех репликах)"""
+    if book.preview_id == preview_id:
+        return CoverTaskStatus.DONE, None
+    task = await session.get(CoverTask, (book.id, preview_id))
+    if task is None:
+        return None
+    return CoverTaskStatus(task.status), task.error
+
+
+def remove_stale_uploads(max_age: int = COVER_TASK_TTL) -> int:
+    """Удаляет файлы загрузок, брошенных дольше max_age секунд назад (например, при перезапуске), возвращает их количество"""
+    expires = time.time() - max_age
+    removed = 0
+    for path in COVER_UPLOAD_DIR.iterdir():
+        try:
+            if path.stat().st_mtime < expires:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
+
+
+async def cover_task_worker() -> None:
+    """Периодически отмечает потерянные задачи обработки обложек, удаляет старые ошибки и брошенные загрузки"""
+    while True:
+        try:
+            removed = await asyncio.to_thread(remove_stale_uploads)
+            if removed:
+                logger.info(f"[+] Removed {removed} stale cover uploads")
+            expired = utc_now() - timedelta(seconds=COVER_TASK_TTL)
+            async with AsyncSession(async_engine) as session:
+                await session.exec(
+                    update(CoverTask)  # ty: ignore
+                    .where(CoverTask.status == CoverTaskStatus.PENDING.value, CoverTask.updated_at < expired)
+                    .values(status=CoverTaskStatus.FAILED.value, error="Cover processing expired", updated_at=utc_now())
+                )
+                await session.exec(
+                    delete(CoverTask)  # ty: ignore
+                    .where(CoverTask.status == CoverTaskStatus.FAILED.value, CoverTask.updated_at < expired)
+                )
+                await session.commit()
+        except Exception as e:
+            logger.error(f"[-] Cover task cleanup failed: {e}")
+        await asyncio.sleep(COVER_TASK_CLEANUP_INTERVAL)
+
+
+def migrate_flat_covers() -> int:
+    """Переносит обложки, сохраненные до разбиения по подкаталогам, в их подкаталоги"""
+    moved = 0
+    extensions = {f".{ext}" for ext in PREVIEW_FORMATS.values()}
+    for path in BOOKS_PREVIEW_DIR.iterdir():
+        if not path.is_file() or path.suffix not in extensions:
+            continue
+        target = BOOKS_PREVIEW_DIR / path.name[:2] / path.name
+        target.parent.mkdir(exist_ok=True)
+        os.replace(path, target)
+        moved += 1
+    return moved
+
+
+def backfill_renditions(preview_ids: list[str], workers: int = COVER_WORKERS, force: bool = False) -> tuple[int, int]:
+    """Создает уменьшенные копии существующих обложек в пуле процессов, возвращает (создано, ошибок)"""
+    if not force:
+        preview_ids = [pid for pid in preview_ids if not has_preview_files(BOOKS_PREVIEW_DIR, pid)]
+        if cover_storage.remote:
+            preview_ids = [pid for pid in preview_ids if not cover_storage.exists(pid)]
+
+    created = failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, workers), mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(generate_renditions, BOOKS_PREVIEW_DIR, pid): pid for pid in preview_ids}
+        for future in as_completed(futures):
+            try:
+                if future.result():
+                    created += 1
+                else:
+                    failed += 1
+                    logger.warning(f"[-] Cover {futures[future]} has no source PNG")
+            except Exception as e:
+                failed += 1
+                logger.error(f"[-] Renditions for cover {futures[future]} failed: {e}")
+    return created, failed
+
+
+def publish_local_covers(preview_ids: list[str]) -> int:
+    """Публикует обложки из рабочего каталога во внешнее хранилище, возвращает их количество"""
+    if not cover_storage.remote:
+        return 0
+    published = 0
+    for preview_id in preview_ids:
+        if has_preview_files(BOOKS_PREVIEW_DIR, preview_id):
+            cover_storage.publish(preview_id)
+            published += 1
+    return published
@@ -0,0 +1,120 @@
+"""Модуль хранилищ обработанных обложек книг"""
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from library_service.settings import (
+    BOOKS_PREVIEW_DIR,
+    COVER_STORAGE,
+    S3_ACCESS_KEY,
+    S3_BUCKET,
+    S3_ENDPOINT_URL,
+    S3_REGION,
+    S3_SECRET_KEY,
+)
+from .image_processing import has_preview_files, preview_files, PREVIEW_FORMATS
+
+
+# Файлы обложек неизменяемы: имя определяется содержимым
+COVER_CACHE_CONTROL = "public, max-age=31536000, immutable"
+COVER_CONTENT_TYPES = {f".{ext}": f"image/{fmt}" for fmt, ext in PREVIEW_FORMATS.items()}
+
+
+class CoverStorage(ABC):
+    """Хранилище обложек. Файлы создаются в рабочем каталоге и публикуются в хранилище"""
+
+    remote = False
+
+    def __init__(self, workdir: Path):
+        self.workdir = workdir
+
+    @abstractmethod
+    def exists(self, preview_id: str) -> bool:
+        """Проверяет, что все файлы обложки опубликованы"""
+
+    @abstractmethod
+    def publish(self, preview_id: str) -> None:
+        """Переносит файлы обложки из рабочего каталога в хранилище"""
+
+    @abstractmethod
+    def delete(self, preview_id: str) -> None:
+        """Удаляет файлы обложки из хранилища"""
+
+
+class LocalCoverStorage(CoverStorage):
+    """Обложки на диске сервиса (рабочий каталог и есть хранилище)"""
+
+    def exists(self, preview_id: str) -> bool:
+        return has_preview_files(self.workdir, preview_id)
+
+    def publish(self, preview_id: str) -> None:
+        pass
+
+    def delete(self, preview_id: str) -> None:
+        for path in preview_files(self.workdir, preview_id):
+            path.unlink(missing_ok=True)
+
+
+class S3CoverStorage(CoverStorage):
+    """Обложки в S3-совместимом хранилище (AWS S3, MinIO)"""
+
+    remote = True
+
+    def __init__(self, workdir: Path, bucket: str, **client_options):
+        super().__init__(workdir)
+        try:
+            import boto3
+        except ImportError as e:
+            raise RuntimeError("COVER_STORAGE=s3 requires boto3, install the 's3' extra") from e
+        self.bucket = bucket
+        self.client = boto3.client("s3", **client_options)
+
+    def _key(self, path: Path) -> str:
+        return path.relative_to(self.workdir).as_posix()
+
+    def exists(self, preview_id: str) -> bool:
+        # Полноразмерный PNG загружается последним, его наличие означает полную публикацию
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(preview_files(self.workdir, preview_id)[0]))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def publish(self, preview_id: str) -> None:
+        paths = preview_files(self.workdir, preview_id)
+        for path in reversed(paths):
+            self.client.upload_file(
+                str(path),
+                self.bucket,
+                self._key(path),
+                ExtraArgs={
+                    "ContentType": COVER_CONTENT_TYPES[path.suffix],
+                    "CacheControl": COVER_CACHE_CONTROL,
+                },
+            )
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    def delete(self, preview_id: str) -> None:
+        keys = [{"Key": self._key(path)} for path in preview_files(self.workdir, preview_id)]
+        self.client.delete_objects(Bucket=self.bucket, Delete={"Objects": keys, "Quiet": True})
+
+
+def create_cover_storage() -> CoverStorage:
+    """Создает хранилище обложек по настройке COVER_STORAGE"""
+    if COVER_STORAGE == "s3":
+        return S3CoverStorage(
+            BOOKS_PREVIEW_DIR,
+            S3_BUCKET,
+            endpoint_url=S3_ENDPOINT_URL,
+            region_name=S3_REGION,
+            aws_access_key_id=S3_ACCESS_KEY,
+            aws_secret_access_key=S3_SECRET_KEY,
+        )
+    return LocalCoverStorage(BOOKS_PREVIEW_DIR)
+
+
+cover_storage = create_cover_storage()
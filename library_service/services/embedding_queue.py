@@ -0,0 +1,237 @@
+"""Модуль очереди генерации эмбеддингов книг (outbox)"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import delete, extract, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, func, select
+
+from library_service.models.db import Book, EmbeddingJob
+from library_service.models.enums import EmbeddingJobStatus
+from library_service.settings import (
+    engine,
+    get_logger,
+    EMBEDDINGS_BATCH_SIZE,
+    EMBEDDING_JOB_POLL_INTERVAL,
+    EMBEDDING_JOB_LEASE,
+    EMBEDDING_JOB_MAX_ATTEMPTS,
+    EMBEDDING_JOB_BACKOFF,
+)
+from .embeddings import book_embedding_text, embedding_source_hash, generate_embeddings, update_books
+
+
+logger = get_logger()
+
+# (id задачи, ревизия, попытка, id книги, текст книги)
+ClaimedJob = Tuple[int, int, int, int, str]
+
+
+def enqueue_embedding_job(session: Session, book_id: int) -> None:
+    """Ставит книгу в очередь генерации эмбеддинга в текущей транзакции"""
+    enqueue_embedding_jobs(session, [book_id])
+
+
+def enqueue_embedding_jobs(session: Session, book_ids: List[int]) -> None:
+    """Ставит книги в очередь генерации эмбеддингов одним запросом в текущей транзакции"""
+    if not book_ids:
+        return
+    now = datetime.now(timezone.utc)
+    statement = insert(EmbeddingJob).values([
+        {
+            "book_id": book_id,
+            "status": EmbeddingJobStatus.PENDING.value,
+            "revision": 1,
+            "attempts": 0,
+            "available_at": now,
+            "created_at": now,
+        }
+        for book_id in dict.fromkeys(book_ids)
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=["book_id"],
+        set_={
+            "status": EmbeddingJobStatus.PENDING.value,
+            "revision": EmbeddingJob.revision + 1,
+            "attempts": 0,
+            "last_error": None,
+            "available_at": now,
+        },
+    )
+    session.execute(statement)
+
+
+def _claim_jobs(limit: int) -> List[ClaimedJob]:
+    """Захватывает готовые задачи на время аренды (FOR UPDATE SKIP LOCKED)"""
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        rows = session.exec(
+            select(EmbeddingJob.id, EmbeddingJob.revision, EmbeddingJob.attempts, Book.id, Book.title, Book.description)
+            .join(Book, Book.id == EmbeddingJob.book_id)  # ty: ignore
+            .where(EmbeddingJob.status == EmbeddingJobStatus.PENDING)
+            .where(EmbeddingJob.available_at <= now)
+            .order_by(EmbeddingJob.available_at)  # ty: ignore
+            .limit(limit)
+            .with_for_update(of=EmbeddingJob, skip_locked=True)  # ty: ignore
+        ).all()
+
+        if not rows:
+            return []
+
+        session.execute(
+            update(EmbeddingJob)
+            .where(EmbeddingJob.id.in_([row[0] for row in rows]))  # ty: ignore
+            .values(
+                attempts=EmbeddingJob.attempts + 1,
+                available_at=now + timedelta(seconds=EMBEDDING_JOB_LEASE),
+            )
+        )
+        session.commit()
+
+    return [
+        (job_id, revision, attempts + 1, book_id, book_embedding_text(title, description))
+        for job_id, revision, attempts, book_id, title, description in rows
+    ]
+
+
+def _complete_jobs(jobs: List[ClaimedJob], embeddings: List[List[float]]) -> None:
+    """Сохраняет эмбеддинги и удаляет выполненные задачи"""
+    with Session(engine) as session:
+        update_books(session, [
+            {"id": job[3], "embedding": embedding, "embedding_source_hash": embedding_source_hash(job[4])}
+            for job, embedding in zip(jobs, embeddings)
+        ])
+        # Задачи, переставленные в очередь во время обработки, остаются
+        session.execute(
+            delete(EmbeddingJob).where(
+                tuple_(EmbeddingJob.id, EmbeddingJob.revision).in_([(job[0], job[1]) for job in jobs])
+            )
+        )
+        session.commit()
+
+
+def _fail_job(job: ClaimedJob, error: str) -> None:
+    """Откладывает задачу с экспоненциальной задержкой или переводит ее в неудачные"""
+    job_id, revision, attempts, book_id, _ = job
+    failed = attempts >= EMBEDDING_JOB_MAX_ATTEMPTS
+    delay = min(EMBEDDING_JOB_BACKOFF * 2 ** (attempts - 1), 3600)
+
+    with Session(engine) as session:
+        session.execute(
+            update(EmbeddingJob)
+            .where(EmbeddingJob.id == job_id, EmbeddingJob.revision == revision)  # ty: ignore
+            .values(
+                status=(EmbeddingJobStatus.FAILED if failed else EmbeddingJobStatus.PENDING).value,
+                last_error=error[:1000],
+                available_at=datetime.now(timezone.utc) + timedelta(seconds=delay),
+            )
+        )
+        session.commit()
+
+    if failed:
+        logger.error(f"[-] Embedding job for book {book_id} failed after {attempts} attempts: {error}")
+    else:
+        logger.warning(f"[-] Embedding job for book {book_id} failed, retry in {delay}s: {error}")
+
+
+def process_embedding_jobs(limit: int = EMBEDDINGS_BATCH_SIZE) -> int:
+    """Обрабатывает пакет задач из очереди, возвращает количество захваченных задач"""
+    jobs = _claim_jobs(limit)
+    if not jobs:
+        return 0
+
+    try:
+        _complete_jobs(jobs, generate_embeddings([job[4] for job in jobs]))
+        return len(jobs)
+    except Exception as e:
+        if len(jobs) == 1:
+            _fail_job(jobs[0], str(e))
+            return 1
+
+    # Ошибка одной книги не должна откладывать весь пакет
+    for job in jobs:
+        try:
+            _complete_jobs([job], generate_embeddings([job[4]]))
+        except Exception as e:
+            _fail_job(job, str(e))
+    return len(jobs)
+
+
+async def embedding_worker() -> None:
+    """Фоновый обработчик очереди генерации эмбеддингов"""
+    logger.info("[+] Embedding queue worker started")
+    while True:
+        try:
+            processed = await asyncio.to_thread(process_embedding_jobs)
+        except Exception as e:
+            logger.error(f"[-] Embedding queue worker error: {e}")
+            processed = 0
+
+        if not processed:
+            await asyncio.sleep(EMBEDDING_JOB_POLL_INTERVAL)
+
+
+def get_embedding_queue_stats(session: Session) -> Dict[str, Any]:
+    """Возвращает размер очереди и возраст самой старой задачи"""
+    now = datetime.now(timezone.utc)
+    pending, failed, due, oldest_age = session.exec(
+        select(
+            func.count().filter(EmbeddingJob.status == EmbeddingJobStatus.PENDING),
+            func.count().filter(EmbeddingJob.status == EmbeddingJobStatus.FAILED),
+            func.count().filter(
+                EmbeddingJob.status == EmbeddingJobStatus.PENDING,
+                EmbeddingJob.available_at <= now,
+            ),
+            # Возраст считается в БД: created_at приводится к часовому поясу сессии так же, как при записи
+            extract(
+                "epoch",
+                func.now() - func.min(EmbeddingJob.created_at).filter(EmbeddingJob.status == EmbeddingJobStatus.PENDING),
+            ),
+        )
+    ).one()
+
+    return {
+        "pending": pending,
+        "failed": failed,
+        "due": due,
+        "oldest_pending_seconds": max(round(float(oldest_age), 2), 0.0) if oldest_age is not None else 0.0,
+    }
+
+
+def get_failed_embedding_jobs(session: Session) -> List[Dict[str, Any]]:
+    """Возвращает задачи, исчерпавшие попытки генерации"""
+    rows = session.exec(
+        select(
+            EmbeddingJob.id,
+            EmbeddingJob.book_id,
+            Book.title.label("book_title"),  # ty: ignore
+            EmbeddingJob.status,
+            EmbeddingJob.attempts,
+            EmbeddingJob.last_error,
+            EmbeddingJob.available_at,
+            EmbeddingJob.created_at,
+        )
+        .join(Book, Book.id == EmbeddingJob.book_id)  # ty: ignore
+        .where(EmbeddingJob.status == EmbeddingJobStatus.FAILED)
+        .order_by(EmbeddingJob.id)  # ty: ignore
+    ).all()
+    return [dict(row._mapping) for row in rows]
+
+
+def retry_failed_embedding_jobs(session: Session, book_ids: List[int] | None = None) -> int:
+    """Возвращает неудачные задачи в очередь"""
+    statement = (
+        update(EmbeddingJob)
+        .where(EmbeddingJob.status == EmbeddingJobStatus.FAILED)  # ty: ignore
+        .values(
+            status=EmbeddingJobStatus.PENDING.value,
+            attempts=0,
+            available_at=datetime.now(timezone.utc),
+        )
+    )
+    if book_ids is not None:
+        statement = statement.where(EmbeddingJob.book_id.in_(book_ids))  # ty: ignore
+
+    result = session.execute(statement)
+    session.commit()
+    return result.rowcount
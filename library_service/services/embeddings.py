@@ -1,13 +1,99 @@
 """Модуль работы с векторными эмбеддингами"""
-from typing import List, Optional
+import hashlib
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from time import monotonic
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from ollama import Client
 
-from library_service.settings import OLLAMA_URL, EMBEDDINGS_MODEL, get_logger
+from library_service.settings import (
+    OLLAMA_URL,
+    EMBEDDINGS_MODEL,
+    EMBEDDINGS_BATCH_SIZE,
+    EMBEDDINGS_WORKERS,
+    SEARCH_CACHE_SIZE,
+    SEARCH_CACHE_TTL,
+    SEARCH_CACHE_PERSIST,
+    get_logger,
+)
 
 
+REGENERATION_CHECKPOINT = "regenerate_embeddings"
+
 _client: Optional[Client] = None
 logger = get_logger()
+regeneration_progress: Dict[str, Any] = {
+    "running": False,
+    "force": False,
+    "total": 0,
+    "processed": 0,
+    "skipped": 0,
+    "failed": 0,
+    "last_book_id": 0,
+}
+
+
+class EmbeddingCache:
+    """Потокобезопасный LRU-кэш эмбеддингов с ограничением размера и TTL"""
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Tuple[str, str], Tuple[float, List[float]]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Tuple[str, str]) -> List[float] | None:
+        """Возвращает эмбеддинг из кэша или None"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < monotonic():
+                self._data.pop(key, None)
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key: Tuple[str, str], embedding: List[float]) -> None:
+        """Сохраняет эмбеддинг, вытесняя самые старые записи"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (monotonic() + self.ttl, embedding)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def record_miss(self, from_db: bool = False) -> None:
+        """Учитывает промах кэша в памяти (с попаданием в БД или без)"""
+        with self._lock:
+            if from_db:
+                self.db_hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, int | float]:
+        """Возвращает счетчики попаданий и промахов"""
+        with self._lock:
+            lookups = self.hits + self.db_hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.maxsize,
+                "ttl": self.ttl,
+                "persistent": SEARCH_CACHE_PERSIST,
+                "hits": self.hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.db_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+search_cache = EmbeddingCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
 
 
 def get_ollama_client() -> Client:
@@ -25,59 +111,336 @@ def generate_embedding(text: str) -> List[float]:
     return response["embedding"]
 
 
+def generate_embeddings(texts: List[str]) -> List[List[float]]:
+    """Генерирует эмбеддинги для списка текстов одним запросом."""
+    client = get_ollama_client()
+    response = client.embed(model=EMBEDDINGS_MODEL, input=texts)
+    return response["embeddings"]
+
+
+def book_embedding_text(title: str, description: str | None) -> str:
+    """Формирует текст книги для генерации эмбеддинга."""
+    return f"Название книги: {title}. Описание: {description or ''}"
+
+
+def embedding_source_hash(text: str) -> str:
+    """Возвращает хэш модели и текста, по которым строится эмбеддинг."""
+    return hashlib.sha256(f"{EMBEDDINGS_MODEL}\n{text}".encode()).hexdigest()
+
+
 def generate_book_embedding(title: str, description: str) -> List[float]:
     """Генерирует эмбеддинг для книги на основе названия и описания."""
-    full_text = f"Название книги: {title}. Описание: {description}"
-    return generate_embedding(full_text)
+    return generate_embedding(book_embedding_text(title, description))
+
+
+def normalize_query(query: str) -> str:
+    """Нормализует поисковый запрос для использования в качестве ключа кэша"""
+    return " ".join(query.lower().split())
+
+
+def _load_search_embedding(query: str) -> List[float] | None:
+    """Загружает сохраненный эмбеддинг запроса из БД"""
+    from sqlmodel import Session, select
+    from library_service.settings import engine
+    from library_service.models.db import SearchEmbedding
+
+    expires = datetime.now(timezone.utc) - timedelta(seconds=SEARCH_CACHE_TTL)
+    with Session(engine) as session:
+        embedding = session.exec(
+            select(SearchEmbedding.embedding)
+            .where(SearchEmbedding.query == query)
+            .where(SearchEmbedding.model == EMBEDDINGS_MODEL)
+            .where(SearchEmbedding.created_at >= expires)
+        ).first()
+    return [float(x) for x in embedding] if embedding is not None else None
+
+
+def _save_search_embedding(query: str, embedding: List[float]) -> None:
+    """Сохраняет эмбеддинг запроса в БД"""
+    from sqlalchemy.dialects.postgresql import insert
+    from sqlmodel import Session
+    from library_service.settings import engine
+    from library_service.models.db import SearchEmbedding
+
+    statement = insert(SearchEmbedding).values(
+        query=query,
+        model=EMBEDDINGS_MODEL,
+        embedding=embedding,
+        created_at=datetime.now(timezone.utc),
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["query", "model"],
+        set_={"embedding": statement.excluded.embedding, "created_at": statement.excluded.created_at},
+    )
+    with Session(engine) as session:
+        session.execute(statement)
+        session.commit()
 
 
 def generate_search_embedding(query: str) -> List[float]:
-    """Генерирует эмбеддинг для поискового запроса."""
+    """Генерирует эмбеддинг для поискового запроса с использованием кэша."""
+    query = normalize_query(query)
+    key = (EMBEDDINGS_MODEL, query)
+
+    embedding = search_cache.get(key)
+    if embedding is not None:
+        return embedding
+
+    if SEARCH_CACHE_PERSIST:
+        try:
+            embedding = _load_search_embedding(query)
+        except Exception as e:
+            logger.warning(f"[-] Search embedding cache lookup failed: {e}")
+        if embedding is not None:
+            search_cache.record_miss(from_db=True)
+            search_cache.put(key, embedding)
+            return embedding
+
+    search_cache.record_miss()
     search_prompt = f"Represent this sentence for searching relevant passages: {query}"
-    return generate_embedding(search_prompt)
+    embedding = generate_embedding(search_prompt)
+    search_cache.put(key, embedding)
 
+    if SEARCH_CACHE_PERSIST:
+        try:
+            _save_search_embedding(query, embedding)
+        except Exception as e:
+            logger.warning(f"[-] Search embedding cache store failed: {e}")
 
-def regenerate_embeddings(force: bool = False) -> int:
-    """Генерирует эмбеддинги для книг в БД."""
+    return embedding
+
+
+def get_search_cache_stats() -> Dict[str, int | float]:
+    """Возвращает статистику кэша поисковых эмбеддингов"""
+    return search_cache.stats()
+
+
+def prune_search_embeddings() -> int:
+    """Удаляет сохраненные эмбеддинги запросов других моделей и с истекшим TTL"""
+    from sqlalchemy import delete, or_
+    from sqlmodel import Session
+    from library_service.settings import engine
+    from library_service.models.db import SearchEmbedding
+
+    expires = datetime.now(timezone.utc) - timedelta(seconds=SEARCH_CACHE_TTL)
+    with Session(engine) as session:
+        result = session.execute(
+            delete(SearchEmbedding).where(
+                or_(
+                    SearchEmbedding.model != EMBEDDINGS_MODEL,
+                    SearchEmbedding.created_at < expires,
+                )
+            )
+        )
+        session.commit()
+    return result.rowcount
+
+
+def _embed_batch(rows: List[Tuple[int, str, str]]) -> List[Dict[str, Any]]:
+    """Генерирует эмбеддинги для пакета книг"""
+    embeddings = generate_embeddings([text for _, text, _ in rows])
+    return [
+        {"id": book_id, "embedding": embedding, "embedding_source_hash": source_hash}
+        for (book_id, text, source_hash), embedding in zip(rows, embeddings)
+    ]
+
+
+def update_books(session, values: List[Dict[str, Any]]) -> None:
+    """
+    Обновляет книги по id одним executemany.
+    Книги, удаленные за время обработки, просто не совпадают ни с одной строкой.
+    """
+    from sqlalchemy import bindparam, update
+    from library_service.models.db import Book
+
+    if not values:
+        return
+    table = Book.__table__
+    session.execute(
+        update(table).where(table.c.id == bindparam("book_id")),  # ty: ignore
+        [{"book_id": item["id"], **{k: v for k, v in item.items() if k != "id"}} for item in values],
+    )
+
+
+def _iter_book_pages(last_id: int) -> Iterator[List[Tuple[int, str, str | None, str | None, bool]]]:
+    """Постранично (по ключу) читает тексты и хэши книг без загрузки эмбеддингов"""
     from sqlmodel import Session, select
     from library_service.settings import engine
     from library_service.models.db import Book
 
-    with Session(engine) as session:
-        statement = select(Book)
+    while True:
+        statement = (
+            select(
+                Book.id,
+                Book.title,
+                Book.description,
+                Book.embedding_source_hash,
+                Book.embedding.is_not(None),  # ty: ignore
+            )
+            .where(Book.id > last_id)  # ty: ignore
+            .order_by(Book.id)  # ty: ignore
+            .limit(EMBEDDINGS_BATCH_SIZE * 8)
+        )
+
+        with Session(engine) as session:
+            rows = [tuple(row) for row in session.exec(statement).all()]
+
+        if not rows:
+            return
+        yield rows  # ty: ignore
+        last_id = rows[-1][0]
+
+
+def _iter_stale_batches(force: bool, last_id: int) -> Iterator[List[Tuple[int, str, str]]]:
+    """Отбирает книги с устаревшим эмбеддингом и группирует их в пакеты.
+
+    Эмбеддинги без хэша (построенные до его появления) при обычном запуске
+    считаются актуальными и только получают хэш, при принудительном - перестраиваются.
+    """
+    from sqlmodel import Session
+    from library_service.settings import engine
+
+    batch: List[Tuple[int, str, str]] = []
+    for rows in _iter_book_pages(last_id):
+        stamps = []
+        for book_id, title, description, stored_hash, has_embedding in rows:
+            text = book_embedding_text(title, description)
+            source_hash = embedding_source_hash(text)
+            if has_embedding and stored_hash == source_hash:
+                regeneration_progress["skipped"] += 1
+            elif has_embedding and stored_hash is None and not force:
+                stamps.append({"id": book_id, "embedding_source_hash": source_hash})
+                regeneration_progress["skipped"] += 1
+            else:
+                batch.append((book_id, text, source_hash))
+                if len(batch) >= EMBEDDINGS_BATCH_SIZE:
+                    yield batch
+                    batch = []
 
-        if not force:
-            statement = statement.where(Book.embedding == None)  # noqa: E711
+        if stamps:
+            with Session(engine) as session:
+                update_books(session, stamps)
+                session.commit()
 
-        books = session.exec(statement).all()
+    if batch:
+        yield batch
 
-        if not books:
+
+def get_regeneration_progress() -> Dict[str, Any]:
+    """Возвращает прогресс и скорость генерации эмбеддингов"""
+    progress = dict(regeneration_progress)
+    started, finished = progress.pop("_started", None), progress.pop("_finished", None)
+    elapsed = (finished or monotonic()) - started if started else 0.0
+    progress["elapsed_seconds"] = round(elapsed, 2)
+    progress["books_per_second"] = round(progress["processed"] / elapsed, 2) if elapsed > 0 else 0.0
+    return progress
+
+
+def regenerate_embeddings(force: bool = False) -> int:
+    """Генерирует эмбеддинги для книг с измененным текстом или моделью пакетами с сохранением контрольной точки."""
+    from sqlmodel import Session, func, select
+    from library_service.settings import engine
+    from library_service.models.db import Book, EmbeddingCheckpoint
+
+    with Session(engine) as session:
+        checkpoint = session.get(EmbeddingCheckpoint, REGENERATION_CHECKPOINT)
+        if checkpoint is None:
+            checkpoint = EmbeddingCheckpoint(name=REGENERATION_CHECKPOINT, force=force)
+        elif checkpoint.force != force:
+            checkpoint.force, checkpoint.last_book_id, checkpoint.processed = force, 0, 0
+        elif checkpoint.last_book_id:
+            logger.info(f"[+] Resuming embedding generation after book {checkpoint.last_book_id}")
+        start_id, processed = checkpoint.last_book_id, checkpoint.processed
+
+        total = session.exec(
+            select(func.count(Book.id)).where(Book.id > start_id)  # ty: ignore
+        ).one()
+
+        if not total:
             logger.info("[=] No books to process")
+            if checkpoint in session:
+                session.delete(checkpoint)
+                session.commit()
             return 0
 
-        logger.info(f"[+] Generating embeddings for {len(books)} books...")
-        processed = 0
+        session.add(checkpoint)
+        session.commit()
+
+    regeneration_progress.update(
+        running=True, force=force, total=total + processed, processed=processed,
+        skipped=0, failed=0, last_book_id=start_id, _started=monotonic(), _finished=None,
+    )
+    logger.info(f"[+] Checking embeddings of {total} books...")
 
-        for book in books:
-            try:
-                book.embedding = generate_book_embedding(
-                    book.title,
-                    book.description or ""
-                )
-                session.add(book)
-                logger.debug(f"  [+] Book {book.id}: {book.title[:50]}")
-                processed += 1
-            except Exception as e:
-                logger.warning(f"  [-] Book {book.id}: {e}")
+    def store(rows: List[Tuple[int, str, str]], future: Future) -> None:
+        """Сохраняет результат пакета и сдвигает контрольную точку (неудачный пакет передается в очередь)"""
+        from .embedding_queue import enqueue_embedding_jobs
 
-        session.commit()
-        logger.info(f"[+] Embedding generation complete: {processed}/{len(books)}")
-        return processed
+        failed = False
+        try:
+            values = future.result()
+        except Exception as e:
+            regeneration_progress["failed"] += len(rows)
+            logger.warning(f"  [-] Books {rows[0][0]}..{rows[-1][0]}: {e}, queued for retry")
+            values, failed = [], True
+
+        with Session(engine) as session:
+            update_books(session, values)
+            if failed:
+                enqueue_embedding_jobs(session, [row[0] for row in rows])
+            checkpoint = session.get(EmbeddingCheckpoint, REGENERATION_CHECKPOINT)
+            if checkpoint is not None:
+                checkpoint.last_book_id = rows[-1][0]
+                checkpoint.processed += len(values)
+                checkpoint.updated_at = datetime.now(timezone.utc)
+                session.add(checkpoint)
+            session.commit()
+
+        regeneration_progress["processed"] += len(values)
+        regeneration_progress["last_book_id"] = rows[-1][0]
+        progress = get_regeneration_progress()
+        logger.info(
+            f"  [+] {progress['processed'] + progress['skipped']}/{progress['total']} books checked, "
+            f"{progress['processed']} generated ({progress['books_per_second']} books/s)"
+        )
+
+    try:
+        in_flight: deque[Tuple[List[Tuple[int, str, str]], Future]] = deque()
+        with ThreadPoolExecutor(max_workers=EMBEDDINGS_WORKERS) as executor:
+            for rows in _iter_stale_batches(force, start_id):
+                in_flight.append((rows, executor.submit(_embed_batch, rows)))
+                if len(in_flight) >= EMBEDDINGS_WORKERS * 2:
+                    store(*in_flight.popleft())
+            while in_flight:
+                store(*in_flight.popleft())
+
+        with Session(engine) as session:
+            checkpoint = session.get(EmbeddingCheckpoint, REGENERATION_CHECKPOINT)
+            if checkpoint is not None:
+                session.delete(checkpoint)
+                session.commit()
+    finally:
+        regeneration_progress.update(running=False, _finished=monotonic())
+
+    processed = regeneration_progress["processed"]
+    logger.info(
+        f"[+] Embedding generation complete: {processed} generated, "
+        f"{regeneration_progress['skipped']} up to date"
+    )
+    return processed
 
 
 def ensure_embeddings(force: bool, skip: bool) -> None:
     """Проверяет и генерирует отсутствующие эмбеддинги"""
 
+    if SEARCH_CACHE_PERSIST:
+        try:
+            pruned = prune_search_embeddings()
+            if pruned:
+                logger.info(f"[+] Pruned {pruned} cached search embeddings")
+        except Exception as e:
+            logger.warning(f"[-] Search embeddings pruning failed: {e}")
+
     if skip:
         logger.info("[=] Embeddings generation skipped")
         return
@@ -1,9 +1,56 @@
+import hashlib, os
 from pathlib import Path
+from uuid import uuid4
+
 from PIL import Image
 
+from library_service.settings import COVER_PUBLIC_URL
+
 
 TARGET_RATIO = 5 / 7
 
+# Форматы обложки и расширения их файлов
+PREVIEW_FORMATS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+# Ширины уменьшенных копий обложки (полноразмерная копия хранится без суффикса)
+RENDITION_WIDTHS = (96, 240, 480)
+
+# Версия обработки: входит в хэш обложки, чтобы смена параметров давала новые URL
+COVER_PIPELINE_VERSION = 1
+
+
+def cover_hasher():
+    """Возвращает хэш содержимого загружаемой обложки"""
+    return hashlib.sha256(f"cover-v{COVER_PIPELINE_VERSION}:".encode())
+
+
+def preview_path(preview_id) -> str:
+    """Относительный путь обложки без расширения (подкаталог по первым символам идентификатора)"""
+    preview_id = str(preview_id)
+    return f"{preview_id[:2]}/{preview_id}"
+
+
+def preview_files(folder: Path, preview_id) -> list[Path]:
+    """Возвращает пути всех файлов обложки: полноразмерных и уменьшенных копий"""
+    base = folder / preview_path(preview_id)
+    return [
+        base.with_name(f"{base.name}{suffix}.{ext}")
+        for suffix in ("", *(f"-{width}" for width in RENDITION_WIDTHS))
+        for ext in PREVIEW_FORMATS.values()
+    ]
+
+
+def get_preview_urls(preview_id) -> dict[str, str]:
+    """Возвращает URL обложки книги в доступных форматах и srcset уменьшенных копий"""
+    if not preview_id:
+        return {}
+    base = f"{COVER_PUBLIC_URL}/{preview_path(preview_id)}"
+    urls = {}
+    for fmt, ext in PREVIEW_FORMATS.items():
+        urls[fmt] = f"{base}.{ext}"
+        urls[f"{fmt}_srcset"] = ", ".join(f"{base}-{width}.{ext} {width}w" for width in RENDITION_WIDTHS)
+    return urls
+
 
 def crop_image(img: Image.Image, target_ratio: float = TARGET_RATIO) -> Image.Image:
     w, h = img.size
@@ -25,30 +72,29 @@ def crop_image(img: Image.Image, target_ratio: float = TARGET_RATIO) -> Image.Im
     return img.crop((left, top, right, bottom))
 
 
-def transcode_image(
-    src_path: str | Path,
+def _save_atomic(img: Image.Image, path: Path, **params) -> None:
+    """Сохраняет изображение во временный файл и атомарно переименовывает его"""
+    tmp_path = path.with_name(f".{path.name}.{uuid4().hex}.tmp")
+    try:
+        img.save(tmp_path, **params)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def save_formats(
+    img: Image.Image,
+    folder: Path,
+    stem: str,
     *,
     jpeg_quality: int = 85,
     webp_quality: int = 80,
     webp_lossless: bool = False,
-    resize_to: tuple[int, int] | None = None,
-):
-    src_path = Path(src_path)
-
-    if not src_path.exists():
-        raise FileNotFoundError(src_path)
-
-    stem = src_path.stem
-    folder = src_path.parent
-
-    img = Image.open(src_path).convert("RGBA")
-    img = crop_image(img)
-
-    if resize_to:
-        img = img.resize(resize_to, Image.LANCZOS)
-
+) -> dict[str, Path]:
+    """Сохраняет изображение в PNG, JPEG и WEBP"""
     png_path = folder / f"{stem}.png"
-    img.save(
+    _save_atomic(
+        img,
         png_path,
         format="PNG",
         optimize=True,
@@ -56,7 +102,8 @@ def transcode_image(
     )
 
     jpg_path = folder / f"{stem}.jpg"
-    img.convert("RGB").save(
+    _save_atomic(
+        img.convert("RGB"),
         jpg_path,
         format="JPEG",
         quality=jpeg_quality,
@@ -66,7 +113,8 @@ def transcode_image(
     )
 
     webp_path = folder / f"{stem}.webp"
-    img.save(
+    _save_atomic(
+        img,
         webp_path,
         format="WEBP",
         quality=webp_quality,
@@ -79,3 +127,58 @@ def transcode_image(
         "jpeg": jpg_path,
         "webp": webp_path,
     }
+
+
+def save_renditions(img: Image.Image, folder: Path, stem: str, **options) -> None:
+    """Сохраняет уменьшенные копии обложки для srcset (без увеличения маленьких изображений)"""
+    for width in RENDITION_WIDTHS:
+        rendition = img
+        if img.width > width:
+            rendition = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+        save_formats(rendition, folder, f"{stem}-{width}", **options)
+
+
+def transcode_image(
+    src_path: str | Path,
+    dest: str | Path | None = None,
+    *,
+    jpeg_quality: int = 85,
+    webp_quality: int = 80,
+    webp_lossless: bool = False,
+    resize_to: tuple[int, int] | None = None,
+):
+    src_path = Path(src_path)
+
+    if not src_path.exists():
+        raise FileNotFoundError(src_path)
+
+    dest = Path(dest) if dest else src_path.with_suffix("")
+    stem = dest.name
+    folder = dest.parent
+    folder.mkdir(parents=True, exist_ok=True)
+
+    img = Image.open(src_path).convert("RGBA")
+    img = crop_image(img)
+
+    if resize_to:
+        img = img.resize(resize_to, Image.LANCZOS)
+
+    options = {"jpeg_quality": jpeg_quality, "webp_quality": webp_quality, "webp_lossless": webp_lossless}
+    save_renditions(img, folder, stem, **options)
+    return save_formats(img, folder, stem, **options)
+
+
+def has_preview_files(folder: Path, preview_id) -> bool:
+    """Проверяет наличие всех файлов обложки"""
+    return all(path.exists() for path in preview_files(folder, preview_id))
+
+
+def generate_renditions(folder: str | Path, preview_id) -> bool:
+    """Создает уменьшенные копии существующей обложки из ее полноразмерного PNG"""
+    base = Path(folder) / preview_path(preview_id)
+    source = base.with_name(f"{base.name}.png")
+    if not source.exists():
+        return False
+    with Image.open(source) as img:
+        save_renditions(img.convert("RGBA"), base.parent, base.name)
+    return True
@@ -0,0 +1,60 @@
+"""Модуль дневной статистики выдач"""
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy import literal, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, func, select
+
+from library_service.models.db import BookUserLink, LoanDailyStat
+from library_service.settings import engine, get_logger, LOAN_STATS_SNAPSHOT_INTERVAL
+
+
+logger = get_logger()
+
+
+def snapshot_overdue_loans(session: Session) -> int:
+    """Записывает в статистику текущего дня количество просроченных выдач по книгам"""
+    now = datetime.now(timezone.utc)
+    today = now.date()
+    overdue = (
+        select(BookUserLink.book_id, func.count().label("overdue"))
+        .where(col(BookUserLink.returned_at).is_(None))
+        .where(BookUserLink.due_date < now)
+        .group_by(BookUserLink.book_id)  # ty: ignore
+        .subquery()
+    )
+
+    session.exec(
+        update(LoanDailyStat)
+        .where(LoanDailyStat.day == today, LoanDailyStat.overdue != 0)  # ty: ignore
+        .values(overdue=0)
+    )
+    statement = insert(LoanDailyStat).from_select(
+        ["day", "book_id", "overdue"],
+        select(literal(today), overdue.c.book_id, overdue.c.overdue),
+    )
+    result = session.exec(
+        statement.on_conflict_do_update(
+            index_elements=["day", "book_id"],
+            set_={"overdue": statement.excluded.overdue},
+        )
+    )
+    session.commit()
+    return result.rowcount  # ty: ignore
+
+
+def _take_snapshot() -> int:
+    with Session(engine) as session:
+        return snapshot_overdue_loans(session)
+
+
+async def loan_stats_worker() -> None:
+    """Фоновая задача периодического снимка просроченных выдач"""
+    while True:
+        try:
+            books = await asyncio.to_thread(_take_snapshot)
+            logger.info(f"[+] Overdue snapshot taken for {books} books")
+        except Exception as e:
+            logger.error(f"[-] Overdue snapshot error: {e}")
+        await asyncio.sleep(LOAN_STATS_SNAPSHOT_INTERVAL)
@@ -0,0 +1,68 @@
+"""Модуль курсорной пагинации и подсчета результатов"""
+import base64, json
+from typing import Any, List, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from library_service.settings import COUNT_EXACT_LIMIT
+
+
+# Диапазон значений типа integer в PostgreSQL
+PG_INTEGER_RANGE = (-2**31, 2**31 - 1)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Упаковывает значения ключа последней строки в непрозрачный курсор"""
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Распаковывает курсор, проверяя количество значений"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    return values
+
+
+def is_cursor_id(value: Any) -> bool:
+    """Проверяет, что значение из курсора — идентификатор, допустимый для колонки integer"""
+    return (
+        isinstance(value, int)
+        and not isinstance(value, bool)
+        and PG_INTEGER_RANGE[0] <= value <= PG_INTEGER_RANGE[1]
+    )
+
+
+async def estimate_rows(session: AsyncSession, statement) -> int:
+    """Оценивает количество строк запроса по плану PostgreSQL без его выполнения"""
+    compiled = statement.compile(
+        dialect=session.bind.dialect,  # ty: ignore
+        compile_kwargs={"literal_binds": True},
+    )
+    # Строка уже содержит значения параметров: выполняется в обход разбора text(), где ":слово" стало бы параметром
+    connection = await session.connection()
+    plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(session: AsyncSession, statement, limit: int = COUNT_EXACT_LIMIT) -> Tuple[int, bool]:
+    """
+    Возвращает количество строк запроса и признак оценки.
+    Точно считается не более limit строк, для больших выборок используется оценка планировщика.
+    """
+    capped = select(func.count()).select_from(statement.order_by(None).limit(limit + 1).subquery())
+    total = await session.scalar(capped) or 0
+    if total <= limit:
+        return total, False
+    return max(await estimate_rows(session, statement.order_by(None)), total), True
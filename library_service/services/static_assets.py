@@ -0,0 +1,125 @@
+"""Модуль сборки статических ассетов: хэш в имени файла, сжатые копии и манифест"""
+import gzip, hashlib, json, os, re
+from pathlib import Path
+
+from library_service.settings import get_logger, STATIC_ASSETS_DIR, STATIC_DIR, BOOKS_PREVIEW_DIR
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен, без него создаются только .gz
+    brotli = None
+
+
+logger = get_logger()
+
+MANIFEST_NAME = "manifest.json"
+# Типы файлов, для которых создаются сжатые копии (изображения и так сжаты)
+COMPRESSIBLE_SUFFIXES = frozenset({".css", ".js", ".svg", ".ttf", ".json", ".txt"})
+# Сжатая копия сохраняется, только если она меньше исходника хотя бы на 5%
+MIN_COMPRESSION_RATIO = 0.95
+
+CSS_URL_PATTERN = re.compile(r"url\(\s*(['\"]?)([^'\")]+)\1\s*\)")
+
+_manifest: dict[str, str] | None = None
+
+
+def fingerprint_name(name: str, content: bytes) -> str:
+    """Добавляет хэш содержимого в имя файла: styles.css -> styles.1a2b3c4d5e.css"""
+    path = Path(name)
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    return path.with_name(f"{path.stem}.{digest}{path.suffix}").as_posix()
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+
+
+def _write_compressed(path: Path, content: bytes) -> None:
+    """Сохраняет рядом с файлом его .gz и .br копии"""
+    variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(content, quality=11)
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(content) * MIN_COMPRESSION_RATIO:
+            _write_atomic(path.with_name(path.name + suffix), compressed)
+
+
+def _rewrite_css_urls(name: str, content: bytes, manifest: dict[str, str]) -> bytes:
+    """Заменяет относительные ссылки url(...) в CSS на имена собранных файлов"""
+    folder = Path(name).parent
+
+    def replace(match: re.Match) -> str:
+        quote, url = match.groups()
+        target = (folder / url).as_posix()
+        if target not in manifest:
+            return match.group(0)
+        return f"url({quote}{Path(manifest[target]).name}{quote})"
+
+    return CSS_URL_PATTERN.sub(replace, content.decode()).encode()
+
+
+def _source_files() -> list[str]:
+    """Исходные ассеты (без обложек и результатов сборки), CSS в конце"""
+    skipped = (STATIC_ASSETS_DIR, BOOKS_PREVIEW_DIR)
+    names = [
+        path.relative_to(STATIC_DIR).as_posix()
+        for path in STATIC_DIR.rglob("*")
+        if path.is_file()
+        and not path.name.startswith(".")
+        and not any(path.is_relative_to(folder) for folder in skipped)
+    ]
+    return sorted(names, key=lambda name: (name.endswith(".css"), name))
+
+
+def build_static_assets() -> int:
+    """Собирает ассеты в STATIC_ASSETS_DIR и записывает манифест, возвращает количество новых файлов"""
+    global _manifest
+
+    manifest: dict[str, str] = {}
+    built = 0
+    for name in _source_files():
+        content = (STATIC_DIR / name).read_bytes()
+        if name.endswith(".css"):
+            content = _rewrite_css_urls(name, content, manifest)
+        manifest[name] = fingerprint_name(name, content)
+
+        # Файлы прошлых сборок не удаляются: их могут запросить страницы из кэша браузера
+        target = STATIC_ASSETS_DIR / manifest[name]
+        if target.exists():
+            continue
+        _write_atomic(target, content)
+        if target.suffix in COMPRESSIBLE_SUFFIXES:
+            _write_compressed(target, content)
+        built += 1
+
+    _write_atomic(
+        STATIC_ASSETS_DIR / MANIFEST_NAME,
+        json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True).encode(),
+    )
+    _manifest = manifest
+    logger.info(f"[+] Static assets built: {built} new of {len(manifest)}")
+    return built
+
+
+def load_manifest() -> dict[str, str]:
+    """Возвращает манифест ассетов (пустой, если сборка не выполнялась)"""
+    global _manifest
+
+    if _manifest is None:
+        try:
+            _manifest = json.loads((STATIC_ASSETS_DIR / MANIFEST_NAME).read_text())
+        except FileNotFoundError:
+            logger.warning("[-] Static assets manifest not found, serving unversioned files")
+            _manifest = {}
+    return _manifest
+
+
+def asset_url(name: str) -> str:
+    """URL ассета по манифесту (или исходного файла, если его нет в сборке)"""
+    built = load_manifest().get(name)
+    if built is None:
+        return f"/static/{name}"
+    return f"/static/dist/{built}"
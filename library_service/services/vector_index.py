@@ -0,0 +1,145 @@
+"""Модуль управления ANN-индексом эмбеддингов книг"""
+from typing import Any, Dict
+
+from sqlalchemy import Connection, text
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from library_service.settings import (
+    engine,
+    get_logger,
+    EMBEDDINGS_INDEX_TYPE,
+    HNSW_M,
+    HNSW_EF_CONSTRUCTION,
+    HNSW_EF_SEARCH,
+    IVFFLAT_LISTS,
+    IVFFLAT_PROBES,
+)
+
+
+VECTOR_INDEX_NAME = "ix_book_embedding"
+VECTOR_INDEX_BUILD_NAME = f"{VECTOR_INDEX_NAME}_build"
+logger = get_logger()
+
+
+def get_expected_index_options() -> Dict[str, str]:
+    """Возвращает параметры индекса, заданные в настройках"""
+    if EMBEDDINGS_INDEX_TYPE == "ivfflat":
+        return {"lists": str(IVFFLAT_LISTS)}
+    return {"m": str(HNSW_M), "ef_construction": str(HNSW_EF_CONSTRUCTION)}
+
+
+def get_search_params(limit: int = 0) -> Dict[str, int]:
+    """Возвращает параметры поиска по индексу для выборки limit ближайших книг"""
+    if EMBEDDINGS_INDEX_TYPE == "ivfflat":
+        return {"ivfflat.probes": IVFFLAT_PROBES}
+    # HNSW возвращает не больше ef_search строк
+    return {"hnsw.ef_search": max(HNSW_EF_SEARCH, limit)}
+
+
+async def apply_search_params(session: AsyncSession, limit: int = 0) -> None:
+    """Устанавливает параметры поиска по индексу для текущей транзакции (SET LOCAL)"""
+    for name, value in get_search_params(limit).items():
+        await session.execute(
+            text("SELECT set_config(:name, :value, true)"),
+            {"name": name, "value": str(value)},
+        )
+
+
+def _read_index(connection: Connection) -> Dict[str, Any] | None:
+    """Возвращает тип, параметры и состояние существующего индекса"""
+    row = connection.execute(
+        text(
+            "SELECT am.amname, c.reloptions, i.indisvalid, pg_relation_size(c.oid) "
+            "FROM pg_class c "
+            "JOIN pg_am am ON am.oid = c.relam "
+            "JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name"
+        ),
+        {"name": VECTOR_INDEX_NAME},
+    ).first()
+
+    if row is None:
+        return None
+
+    options = dict(option.split("=", 1) for option in (row[1] or []))
+    return {"type": row[0], "options": options, "valid": row[2], "size_bytes": row[3]}
+
+
+def _create_index_sql(name: str) -> str:
+    """Формирует запрос создания индекса согласно настройкам"""
+    options = ", ".join(f"{k} = {v}" for k, v in get_expected_index_options().items())
+    return (
+        f"CREATE INDEX CONCURRENTLY {name} ON book "
+        f"USING {EMBEDDINGS_INDEX_TYPE} (embedding vector_cosine_ops) WITH ({options})"
+    )
+
+
+def ensure_vector_index() -> bool:
+    """Пересоздает индекс, если его тип или параметры не совпадают с настройками"""
+    with engine.connect() as connection:
+        current = _read_index(connection)
+
+    if (
+        current is not None
+        and current["valid"]
+        and current["type"] == EMBEDDINGS_INDEX_TYPE
+        and current["options"] == get_expected_index_options()
+    ):
+        logger.info("[=] Vector index is up to date")
+        return False
+
+    # Новый индекс строится под временным именем, старый продолжает обслуживать поиск до замены
+    logger.info(f"[+] Building {EMBEDDINGS_INDEX_TYPE} vector index...")
+    try:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {VECTOR_INDEX_BUILD_NAME}"))
+            connection.execute(text(_create_index_sql(VECTOR_INDEX_BUILD_NAME)))
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP INDEX IF EXISTS {VECTOR_INDEX_NAME}"))
+            connection.execute(text(f"ALTER INDEX {VECTOR_INDEX_BUILD_NAME} RENAME TO {VECTOR_INDEX_NAME}"))
+    except Exception as e:
+        logger.error(f"[-] Vector index build failed: {e}")
+        return False
+
+    logger.info("[+] Vector index build complete")
+    return True
+
+
+def get_vector_index_status(session: Session) -> Dict[str, Any]:
+    """Возвращает размер индекса, его параметры и прогресс построения"""
+    current = _read_index(session.connection())
+
+    progress = session.execute(
+        text(
+            "SELECT phase, blocks_done, blocks_total, tuples_done, tuples_total "
+            "FROM pg_stat_progress_create_index WHERE relid = 'book'::regclass"
+        )
+    ).first()
+
+    counts = session.execute(
+        text("SELECT count(*), count(embedding) FROM book")
+    ).one()
+
+    return {
+        "name": VECTOR_INDEX_NAME,
+        "exists": current is not None,
+        "type": current["type"] if current else None,
+        "valid": current["valid"] if current else False,
+        "options": current["options"] if current else {},
+        "size_bytes": current["size_bytes"] if current else 0,
+        "expected": {
+            "type": EMBEDDINGS_INDEX_TYPE,
+            "options": get_expected_index_options(),
+        },
+        "search_params": get_search_params(),
+        "books_total": counts[0],
+        "books_embedded": counts[1],
+        "build": {
+            "phase": progress[0],
+            "blocks_done": progress[1],
+            "blocks_total": progress[2],
+            "tuples_done": progress[3],
+            "tuples_total": progress[4],
+        } if progress else None,
+    }
@@ -1,18 +1,29 @@
 """Модуль настроек проекта"""
 
-import os, logging
+import os, logging, tempfile
+from dataclasses import dataclass
+from hashlib import sha256
 from pathlib import Path
 
 import psutil
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from toml import load
 
 load_dotenv()
 
-BOOKS_PREVIEW_DIR = Path(__file__).parent / "static" / "books"
+STATIC_DIR = Path(__file__).parent / "static"
+# Собранные ассеты: копии с хэшем содержимого в имени и их сжатые версии
+STATIC_ASSETS_DIR = STATIC_DIR / "dist"
+STATIC_ASSETS_DIR.mkdir(parents=True, exist_ok=True)
+BOOKS_PREVIEW_DIR = STATIC_DIR / "books"
 BOOKS_PREVIEW_DIR.mkdir(parents=True, exist_ok=True)
+# Загруженные обложки, ожидающие обработки (плоский каталог вне раздаваемой статики)
+COVER_UPLOAD_DIR = Path(os.getenv("COVER_UPLOAD_DIR") or Path(tempfile.gettempdir()) / "library_service_uploads")
+COVER_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 with open("pyproject.toml", "r", encoding="utf-8") as f:
     _pyproject = load(f)
@@ -65,18 +76,48 @@ OPENAPI_TAGS = [
     {"name": "loans", "description": "Действия с выдачами."},
     {"name": "relations", "description": "Действия со связями."},
     {"name": "users", "description": "Действия с пользователями."},
+    {"name": "export", "description": "Потоковая выгрузка каталога."},
     {"name": "captcha", "description": "Создание и проверка cap.js каптчи."},
     {"name": "misc", "description": "Прочие."},
 ]
 
 
+@dataclass(frozen=True, slots=True)
+class AppInfo:
+    """Неизменяемые сведения о приложении, вычисляемые один раз при запуске"""
+
+    title: str
+    version: str
+    description: str
+    domain: str
+    etag: str
+
+
+def load_app_info() -> AppInfo:
+    """Собирает сведения о приложении из pyproject.toml и окружения"""
+    project_cfg = _pyproject["project"]
+    title = project_cfg["name"]
+    version = project_cfg["version"]
+    description = project_cfg["description"]
+    domain = os.getenv("DOMAIN", "")
+    digest = sha256("\n".join((title, version, description, domain)).encode()).hexdigest()
+    return AppInfo(title, version, description, domain, f'W/"{digest[:16]}"')
+
+
+APP_INFO = load_app_info()
+
+
+async def get_app_info() -> AppInfo:
+    """Возвращает сведения о приложении"""
+    return APP_INFO
+
+
 def get_app(lifespan=None, /) -> FastAPI:
     """Возвращает экземпляр FastAPI приложения"""
-    project_cfg = _pyproject["project"]
     return FastAPI(
-        title=project_cfg["name"],
-        description=f"{project_cfg['description']} | [Вернуться на главную](/)",
-        version=project_cfg["version"],
+        title=APP_INFO.title,
+        description=f"{APP_INFO.description} | [Вернуться на главную](/)",
+        version=APP_INFO.version,
         lifespan=lifespan,
         openapi_tags=OPENAPI_TAGS,
     )
@@ -93,16 +134,119 @@ def get_session():
         yield session
 
 
+async def get_async_session():
+    """Возвращает асинхронную сессию базы данных"""
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
 HOST = os.getenv("POSTGRES_HOST")
 PORT = os.getenv("POSTGRES_PORT")
 USER = os.getenv("POSTGRES_USER")
 PASSWORD = os.getenv("POSTGRES_PASSWORD")
 DATABASE = os.getenv("POSTGRES_DB")
+POSTGRES_POOL_SIZE = int(os.getenv("POSTGRES_POOL_SIZE", "10"))
+POSTGRES_MAX_OVERFLOW = int(os.getenv("POSTGRES_MAX_OVERFLOW", "20"))
+POSTGRES_POOL_PRE_PING = os.getenv("POSTGRES_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+POSTGRES_POOL_RECYCLE = int(os.getenv("POSTGRES_POOL_RECYCLE", "1800"))
+
+# Конфигурация запуска (количество процессов)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+
+
+def skip_prepare() -> bool:
+    """Проверяет, выполнил ли подготовку запускающий процесс (флаг читается при запуске воркера, а не при импорте)"""
+    return os.getenv("SKIP_PREPARE", "").lower() in ("1", "true", "yes")
+
 
 OLLAMA_URL = os.getenv("OLLAMA_URL")
 EMBEDDINGS_MODEL = os.getenv("EMBEDDINGS_MODEL", "bge-m3")
 REGENERATE_EMBEDDINGS_FORCE = os.getenv("REGENERATE_EMBEDDINGS", "").lower() in ("1", "true", "yes")
 SKIP_REGENERATE_EMBEDDINGS = os.getenv("SKIP_EMBEDDINGS", "").lower() in ("1", "true", "yes")
+EMBEDDINGS_BATCH_SIZE = int(os.getenv("EMBEDDINGS_BATCH_SIZE", "32"))
+EMBEDDINGS_WORKERS = int(os.getenv("EMBEDDINGS_WORKERS", "2"))
+
+# Конфигурация очереди генерации эмбеддингов
+EMBEDDING_JOB_POLL_INTERVAL = float(os.getenv("EMBEDDING_JOB_POLL_INTERVAL", "1"))
+EMBEDDING_JOB_LEASE = int(os.getenv("EMBEDDING_JOB_LEASE", "120"))
+EMBEDDING_JOB_MAX_ATTEMPTS = int(os.getenv("EMBEDDING_JOB_MAX_ATTEMPTS", "5"))
+EMBEDDING_JOB_BACKOFF = int(os.getenv("EMBEDDING_JOB_BACKOFF", "5"))
+
+# Размер пачки строк при потоковой выдаче книг
+BOOKS_STREAM_BATCH_SIZE = int(os.getenv("BOOKS_STREAM_BATCH_SIZE", "500"))
+
+# Конфигурация обработки обложек (процессы, очередь сверх них и максимальный размер файла)
+COVER_WORKERS = int(os.getenv("COVER_WORKERS", "2"))
+COVER_QUEUE_SIZE = int(os.getenv("COVER_QUEUE_SIZE", "8"))
+COVER_MAX_SIZE = int(os.getenv("COVER_MAX_SIZE", str(32 * 1024 * 1024)))
+# Время (в секундах), после которого незавершенная задача обработки обложки считается потерянной,
+# а завершенная с ошибкой удаляется, и период проверки
+COVER_TASK_TTL = int(os.getenv("COVER_TASK_TTL", "3600"))
+COVER_TASK_CLEANUP_INTERVAL = int(os.getenv("COVER_TASK_CLEANUP_INTERVAL", "300"))
+
+# Хранилище обложек (local или s3) и адрес, с которого клиенты загружают их файлы (origin или CDN)
+COVER_STORAGE = os.getenv("COVER_STORAGE", "local").lower()
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+S3_REGION = os.getenv("S3_REGION", "us-east-1")
+S3_BUCKET = os.getenv("S3_BUCKET", "covers")
+S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY") or None
+S3_SECRET_KEY = os.getenv("S3_SECRET_KEY") or None
+COVER_PUBLIC_URL = os.getenv("COVER_PUBLIC_URL", "").rstrip("/")
+if not COVER_PUBLIC_URL:
+    if COVER_STORAGE != "s3":
+        COVER_PUBLIC_URL = "/static/books"
+    elif S3_ENDPOINT_URL:
+        COVER_PUBLIC_URL = f"{S3_ENDPOINT_URL.rstrip('/')}/{S3_BUCKET}"
+    else:
+        COVER_PUBLIC_URL = f"https://{S3_BUCKET}.s3.{S3_REGION}.amazonaws.com"
+
+# Сжатие ответов: кодировки в порядке предпочтения, минимальный размер ответа и уровни сжатия
+COMPRESSION_ENCODINGS = tuple(
+    encoding.strip() for encoding in os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").lower().split(",") if encoding.strip()
+)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+
+# Порог точного подсчета результатов списков (выше используется оценка планировщика)
+COUNT_EXACT_LIMIT = int(os.getenv("COUNT_EXACT_LIMIT", "10000"))
+
+# Конфигурация выгрузки каталога
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
+
+# Конфигурация массового импорта книг
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "100"))
+
+# Интервал снимка просроченных выдач в дневной статистике (секунды)
+LOAN_STATS_SNAPSHOT_INTERVAL = int(os.getenv("LOAN_STATS_SNAPSHOT_INTERVAL", "3600"))
+
+# Конфигурация ANN-индекса эмбеддингов (hnsw или ivfflat)
+EMBEDDINGS_INDEX_TYPE = os.getenv("EMBEDDINGS_INDEX_TYPE", "hnsw").lower()
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "64"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "40"))
+IVFFLAT_LISTS = int(os.getenv("IVFFLAT_LISTS", "100"))
+IVFFLAT_PROBES = int(os.getenv("IVFFLAT_PROBES", "10"))
+
+# Конфигурация гибридного поиска
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", "200"))
+SEARCH_RRF_K = int(os.getenv("SEARCH_RRF_K", "60"))
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "604800"))
+SEARCH_CACHE_PERSIST = os.getenv("SEARCH_CACHE_PERSIST", "true").lower() in ("1", "true", "yes")
+
+# Кэш пользователей и их ролей в каждом воркере (время жизни записи в секундах и максимальный размер)
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
+if EMBEDDINGS_INDEX_TYPE not in ("hnsw", "ivfflat"):
+    raise ValueError("EMBEDDINGS_INDEX_TYPE must be 'hnsw' or 'ivfflat'")
+
+if COVER_STORAGE not in ("local", "s3"):
+    raise ValueError("COVER_STORAGE must be 'local' or 's3'")
 
 ASSISTANT_LLM = ""
 logger = get_logger()
@@ -118,5 +262,15 @@ else:
 if not all([HOST, PORT, USER, PASSWORD, DATABASE, OLLAMA_URL]):
     raise ValueError("Missing required POSTGRES environment variables")
 
+_pool_options = {
+    "pool_size": POSTGRES_POOL_SIZE,
+    "max_overflow": POSTGRES_MAX_OVERFLOW,
+    "pool_pre_ping": POSTGRES_POOL_PRE_PING,
+    "pool_recycle": POSTGRES_POOL_RECYCLE,
+}
+
 POSTGRES_DATABASE_URL = f"postgresql://{USER}:{PASSWORD}@{HOST}:{PORT}/{DATABASE}"
-engine = create_engine(POSTGRES_DATABASE_URL, echo=False, future=True)
+engine = create_engine(POSTGRES_DATABASE_URL, echo=False, future=True, **_pool_options)
+
+ASYNC_POSTGRES_DATABASE_URL = f"postgresql+asyncpg://{USER}:{PASSWORD}@{HOST}:{PORT}/{DATABASE}"
+async_engine = create_async_engine(ASYNC_POSTGRES_DATABASE_URL, echo=False, **_pool_options)
@@ -32,6 +32,10 @@ $(document).ready(() => {
     },
   };
 
+  // Опрос статуса обработки обложки: раз в секунду, не дольше двух минут
+  const COVER_STATUS_POLL_INTERVAL = 1000;
+  const COVER_STATUS_MAX_POLLS = 120;
+
   const pathParts = window.location.pathname.split("/");
   const bookId = parseInt(pathParts[pathParts.length - 1]);
   let isDraggingOver = false;
@@ -73,6 +77,20 @@ $(document).ready(() => {
     return null;
   }
 
+  function getPreviewSrcset(book) {
+    if (!book.preview_urls) {
+      return "";
+    }
+
+    for (const format of ["webp", "jpeg", "png"]) {
+      if (book.preview_urls[`${format}_srcset`]) {
+        return book.preview_urls[`${format}_srcset`];
+      }
+    }
+
+    return "";
+  }
+
   function setupEventHandlers() {
     $(document).on("click", (e) => {
       const $menu = $("#status-menu");
@@ -214,7 +232,7 @@ $(document).ready(() => {
       const formData = new FormData();
       formData.append("file", file);
 
-      const response = await Api.uploadFile(
+      let response = await Api.uploadFile(
         `/api/books/${bookId}/preview`,
         formData,
       );
@@ -223,6 +241,20 @@ $(document).ready(() => {
         return;
       }
 
+      const statusUrl = response.status_url;
+      let polls = 0;
+      while (statusUrl && response && response.status === "pending") {
+        if (++polls > COVER_STATUS_MAX_POLLS) {
+          throw new Error("Обложка слишком долго обрабатывается, обновите страницу позже");
+        }
+        await new Promise((resolve) => setTimeout(resolve, COVER_STATUS_POLL_INTERVAL));
+        response = await Api.get(statusUrl);
+      }
+
+      if (!response) {
+        return;
+      }
+
       if (response.preview) {
         currentBook.preview_urls = response.preview;
       } else if (response.preview_urls) {
@@ -278,11 +310,14 @@ $(document).ready(() => {
     const $container = $("#book-cover-container");
     const canManage = window.canManage();
     const previewUrl = getPreviewUrl(book);
+    const previewSrcset = getPreviewSrcset(book);
 
     if (previewUrl) {
       $container.html(`
         <img
           src="${Utils.escapeHtml(previewUrl)}"
+          srcset="${Utils.escapeHtml(previewSrcset)}"
+          sizes="160px"
           alt="Обложка книги ${Utils.escapeHtml(book.title)}"
           class="w-full h-full object-cover"
           onerror="this.onerror=null; this.parentElement.querySelector('.cover-fallback').classList.remove('hidden'); this.classList.add('hidden');"
@@ -389,7 +424,7 @@ $(document).ready(() => {
 
     try {
       const data = await Api.get(
-        `/api/loans/?book_id=${bookId}&active_only=true&page=1&size=10`,
+        `/api/loans/?book_id=${bookId}&active_only=true&size=10&include_total=false`,
       );
       activeLoan = data.loans.length > 0 ? data.loans[0] : null;
       renderLoans(data.loans);
@@ -264,21 +264,21 @@ $(document).ready(() => {
 
       const linkPromises = [];
 
-      selectedAuthors.forEach((_, authorId) => {
+      if (selectedAuthors.size > 0) {
         linkPromises.push(
-          Api.post(
-            `/api/relationships/author-book?author_id=${authorId}&book_id=${createdBook.id}`,
-          ),
+          Api.put(`/api/books/${createdBook.id}/authors/`, {
+            ids: Array.from(selectedAuthors.keys()),
+          }),
         );
-      });
+      }
 
-      selectedGenres.forEach((_, genreId) => {
+      if (selectedGenres.size > 0) {
         linkPromises.push(
-          Api.post(
-            `/api/relationships/genre-book?genre_id=${genreId}&book_id=${createdBook.id}`,
-          ),
+          Api.put(`/api/books/${createdBook.id}/genres/`, {
+            ids: Array.from(selectedGenres.keys()),
+          }),
         );
-      });
+      }
 
       if (linkPromises.length > 0) {
         await Promise.allSettled(linkPromises);
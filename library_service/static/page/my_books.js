@@ -16,7 +16,7 @@ $(document).ready(() => {
 
   async function loadLoans() {
     try {
-      const data = await Api.get("/api/loans/?page=1&size=100");
+      const data = await Api.get("/api/loans/?size=100&include_total=false");
       allLoans = data.loans;
 
       const bookIds = [...new Set(allLoans.map((loan) => loan.book_id))];
@@ -25,6 +25,14 @@ from library_service.models.db import *
 
 target_metadata = SQLModel.metadata
 
+# Индексы, которые создаются и перестраиваются при подготовке сервиса, а не миграциями
+RUNTIME_MANAGED_INDEXES = {"ix_book_embedding"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Исключает из автогенерации индексы, управляемые сервисом"""
+    return not (type_ == "index" and name in RUNTIME_MANAGED_INDEXES)
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -47,6 +55,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -69,7 +78,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,36 @@
+"""Book embedding index
+
+Revision ID: 3f9c2d7e81a4
+Revises: abbc38275032
+Create Date: 2026-02-08 18:12:41.503217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel, pgvector
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2d7e81a4'
+down_revision: Union[str, None] = 'abbc38275032'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Параметры индекса сверяются с настройками при запуске сервиса
+    op.create_index(
+        'ix_book_embedding',
+        'book',
+        ['embedding'],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'embedding': 'vector_cosine_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_book_embedding', table_name='book')
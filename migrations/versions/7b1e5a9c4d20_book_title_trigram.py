@@ -0,0 +1,35 @@
+"""Book title trigram index
+
+Revision ID: 7b1e5a9c4d20
+Revises: 3f9c2d7e81a4
+Create Date: 2026-02-10 21:04:17.118640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel, pgvector
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e5a9c4d20'
+down_revision: Union[str, None] = '3f9c2d7e81a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_book_title_trgm',
+        'book',
+        ['title'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'title': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_book_title_trgm', table_name='book')